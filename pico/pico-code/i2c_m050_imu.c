@@ -65,6 +65,33 @@ void read_data(float accel[3], float gyro[3]){
     convert_gyro(gyro, read_buf);
 }
 
+/*
+Read the raw acceleration and gyroscope counts from the mpu6050
+
+Args:
+    accel[] - array to pipe raw acceleration counts into
+    gyro[] - array to pipe raw gyroscope counts into
+*/
+void read_raw_data(int16_t accel[3], int16_t gyro[3]){
+    uint8_t read_buf[6]; // buffer for reading values
+
+    // Read acceleration
+    uint8_t val = ACCEL_XOUT_H;
+    i2c_write_blocking(i2c0, IMU_ADDR, &val, 1, true);
+    i2c_read_blocking(i2c0, IMU_ADDR, read_buf, 6, false);
+    for(int i = 0; i < 3; i++) {
+        accel[i] = (int16_t)(read_buf[i*2] << 8 | read_buf[i*2 + 1]);
+    }
+
+    // Read gyroscope
+    val = GYRO_XOUT_H;
+    i2c_write_blocking(i2c0, IMU_ADDR, &val, 1, true);
+    i2c_read_blocking(i2c0, IMU_ADDR, read_buf, 6, false);
+    for(int i = 0; i < 3; i++) {
+        gyro[i] = (int16_t)(read_buf[i*2] << 8 | read_buf[i*2 + 1]);
+    }
+}
+
 /*
 Reads only acceleration values from the mpu6050
 
@@ -57,6 +57,15 @@ Args:
 */
 void read_data(float accel[3], float gyro[3]);
 
+/*
+Read the raw acceleration and gyroscope counts from the mpu6050
+
+Args:
+    accel[] - array to pipe raw acceleration counts into
+    gyro[] - array to pipe raw gyroscope counts into
+*/
+void read_raw_data(int16_t accel[3], int16_t gyro[3]);
+
 /*
 Reads only acceleration values from the mpu6050
 
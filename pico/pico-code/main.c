@@ -1,12 +1,77 @@
 /*
 Main file for pico code
 - Grabs IMU data from MPU6050
+- Sends acceleration as ASCII text, or every reading as a binary frame when 
+  built with IMU_BINARY_FRAMES
 */
 #include <stdio.h>
 #include "pico/stdlib.h"
 #include "pico/binary_info.h"
 #include "i2c_m050_imu.h"
 
+#ifdef IMU_BINARY_FRAMES
+/*
+Binary frame layout, little-endian, FRAME_SIZE bytes:
+    [0:2]   sync word 0xA5 0x5A
+    [2:4]   uint16 sequence number, wraps at 65536
+    [4:10]  int16 raw acceleration counts x, y, z
+    [10:16] int16 raw gyroscope counts x, y, z
+    [16:18] uint16 CRC-16/CCITT-FALSE of bytes [2:16]
+*/
+#define FRAME_SYNC_0 0xA5
+#define FRAME_SYNC_1 0x5A
+#define FRAME_SIZE 18
+
+/*
+Write a 16-bit value into a buffer, least significant byte first
+*/
+static void put_u16(uint8_t *buf, uint16_t val) {
+    buf[0] = val & 0xFF;
+    buf[1] = val >> 8;
+}
+
+/*
+CRC-16/CCITT-FALSE (poly 0x1021, init 0xFFFF) of a buffer
+*/
+static uint16_t crc16_ccitt(const uint8_t *buf, int len) {
+    uint16_t crc = 0xFFFF;
+    for(int i = 0; i < len; i++) {
+        crc ^= (uint16_t)buf[i] << 8;
+        for(int bit = 0; bit < 8; bit++) {
+            crc = (crc & 0x8000) ? (crc << 1) ^ 0x1021 : crc << 1;
+        }
+    }
+    return crc;
+}
+
+/*
+Repeating timer that reads the raw acceleration and gyroscope counts from the
+mpu6050 and sends them over serial as one binary frame
+*/
+bool read_frame_callback(repeating_timer_t *t) {
+    static uint16_t seq = 0;
+    uint8_t frame[FRAME_SIZE];
+    int16_t accel[3];
+    int16_t gyro[3];
+    read_raw_data(accel, gyro);
+
+    frame[0] = FRAME_SYNC_0;
+    frame[1] = FRAME_SYNC_1;
+    put_u16(&frame[2], seq++);
+    for(int i = 0; i < 3; i++) {
+        put_u16(&frame[4 + i*2], (uint16_t)accel[i]);
+        put_u16(&frame[10 + i*2], (uint16_t)gyro[i]);
+    }
+    put_u16(&frame[16], crc16_ccitt(&frame[2], FRAME_SIZE - 4));
+
+    // Raw writes skip the newline translation of printf
+    for(int i = 0; i < FRAME_SIZE; i++) {
+        putchar_raw(frame[i]);
+    }
+    return true;
+}
+#endif
+
 /*
 Repeating timer that reads the acceleration values from the mpu6050 and sends
 them over serial
@@ -37,7 +102,11 @@ int main() {
 
     // Create repeating timer object
     struct repeating_timer timer;
+#ifdef IMU_BINARY_FRAMES
+    add_repeating_timer_ms(-READ_RATE_MS, read_frame_callback, NULL, &timer);
+#else
     add_repeating_timer_ms(-READ_RATE_MS, read_accel_callback, NULL, &timer);
+#endif
 
     while(true) {
         //This is an infinite while for device
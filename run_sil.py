@@ -4,18 +4,35 @@ Runs Software-in-the-loop simulation with application
 """
 
 # Project import
-from src import CadenceTracker, ClassifierSM, DataQueue, \
-    PendulumGUI, TrajectoryLookUp, TrajectorySplineGenerator
-from utils import parse_mt_file, read_imu
+from src import CadenceTracker, ClassifierSM, DataQueue, LatencyProfiler, \
+    SerialReader, StageScheduler, TrajectoryLookUp, TrajectorySplineGenerator
+from utils import parse_log_file
 # Python import
 import argparse
 from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import contextlib
+import csv
+import glob
+import io
 import os
+import re
+import subprocess
+import sys
+import threading
 import time
 # 3rd-party import
-from matplotlib import pyplot as plt
 import numpy as np
-import serial
+
+# Params of a batch worker process, set by _init_batch_worker
+_BATCH_PARAMS = None
+
+# Degradations live mode may apply when it falls behind the IMU
+LAG_POLICIES = ('skip_classify', 'coalesce', 'drop_gui')
+
+# Optional packages that headless and batch replays should never import
+_HEAVY_MODULES = ('matplotlib', 'plotly', 'pygame', 'serial', 'sklearn', 
+                  'pandas')
 
 
 
@@ -29,19 +46,29 @@ def object_setup(params):
     csm_modelfile = params['modelfile'] # filepath to classifier model
     csm_threshold = params.get('threshold', .8) # threshold for accepting prediction
     csm_window = params.get('csm_window', 3.5) # time window of classifier wrapper
+    csm_streaming = params.get('csm_streaming', False) # use sliding welch
 
     ct_window = params.get('ct_window', 3.5) # time window of cadence tracker
     ct_method = params.get('ct_method', 'direct')
+    ct_filtering = params.get('ct_filtering', 'zero_phase')
+    ct_peak_detection = params.get('ct_peak_detection', 'window')
+
+    csm_hop = params.get('csm_hop', {}) # hop of classifier refreshes
+    ct_hop = params.get('ct_hop', {}) # hop of cadence refreshes
 
     double_pend = params.get('double_pend', False) 
     # Make Objects
     DQ = DataQueue(data_rate_Hz=data_rate, time_window_s=dq_window)
     ClassSM = ClassifierSM(csm_modelfile, threshold=csm_threshold, 
-        time_window=csm_window)
+        time_window=csm_window, streaming=csm_streaming)
     CT = CadenceTracker(data_rate_Hz=data_rate, time_window_s=ct_window,
-        method=ct_method)
+        method=ct_method, filtering=ct_filtering, 
+        peak_detection=ct_peak_detection)
+    SCHED = StageScheduler(data_rate_Hz=data_rate)
+    SCHED.add_stage('classify', **csm_hop)
+    SCHED.add_stage('cadence', **ct_hop)
 
-    if params.get('use_look', False):
+    if params.get('use_lookup', False):
         # Create Trajectory Look-Up
         profiles = {0.8: 'data/template_data/08ms.csv',
                     0.9: 'data/template_data/09ms.csv',
@@ -51,15 +78,19 @@ def object_setup(params):
                     1.3: 'data/template_data/13ms.csv',
                     1.4: 'data/template_data/14ms.csv'}
         TRAJ = TrajectoryLookUp(profiles=profiles)
+        if params.get('traj_speed_grid') is not None:
+            grid_bytes = TRAJ.build_speed_grid(params['traj_speed_grid'])
+            print(f"Speed grid: {len(TRAJ.speed_grid)} speeds, "
+                  f"{grid_bytes/1024:.1f} KiB")
     else:
         TRAJ = TrajectorySplineGenerator(sample_rate=data_rate, 
                                          double_pend=double_pend)
 
-    return DQ, ClassSM, CT, TRAJ
+    return DQ, ClassSM, CT, TRAJ, SCHED
 
 
 def exe_loop(accel_measure, data_rate, DQ, ClassSM, CT, TRAJ, logger_dict, 
-    state, step_count, time_step = -1):
+    state, step_count, time_step = -1, SCHED=None, PROF=None, skip=()):
     """
     Main execution loop
 
@@ -76,27 +107,59 @@ def exe_loop(accel_measure, data_rate, DQ, ClassSM, CT, TRAJ, logger_dict,
         TODO: Remove
         string state - current activity being performed
         int step_count - number of steps taken during run
+        StageScheduler SCHED - decides when classification and cadence 
+            refresh; the last results are held in between. If None, both 
+            refresh every sample
+        LatencyProfiler PROF - records the latency of each stage; stages 
+            skipped by the scheduler are not recorded. If None, nothing is 
+            timed
+        tuple of strings skip - stages, 'classify' and/or 'cadence', to hold 
+            this sample when running behind. Needs SCHED, which then counts 
+            the skipped samples into the stage's next refresh
     """
+    if PROF is not None:
+        start_ns = lap_ns = PROF.now()
     # Add latest data to queue
     DQ.append(accel_measure)
     # Grab the latest elements from queue
     datum = DQ.get_latest_entries(CT.TIME_WINDOW)
+    if SCHED is not None:
+        SCHED.tick()
+    if PROF is not None:
+        lap_ns = PROF.lap('queue', lap_ns)
 
     if datum is not None:
         # Predict which activity is being performed
-        ClassSM.predict(datum, data_rate)
-        if ClassSM.STATE == 'walking':
-            CT.walking = True
+        if SCHED is None:
+            num_new = 1
         else:
-            CT.walking = False
+            num_new = 0 if 'classify' in skip else SCHED.poll('classify')
+        if num_new:
+            ClassSM.predict(datum, data_rate, num_new)
+            if ClassSM.STATE == 'walking':
+                CT.walking = True
+            else:
+                CT.walking = False
+            if PROF is not None:
+                lap_ns = PROF.lap('classify', lap_ns)
 
         # Update cadence
-        CT.update_cadence(datum)
+        if SCHED is None:
+            num_new = 1
+        else:
+            num_new = 0 if 'cadence' in skip else SCHED.poll('cadence')
+        if num_new:
+            CT.update_cadence(datum, num_new)
+            if PROF is not None:
+                lap_ns = PROF.lap('cadence', lap_ns)
 
         # Update target angle
         el_angle, sh_angle = TRAJ.get_pos_setpoint(CT.steps_per_window, 
                                                    CT.TIME_WINDOW,
                                                    CT.time_till_step)
+        if PROF is not None:
+            PROF.lap('trajectory', lap_ns)
+            PROF.lap('total', start_ns)
 
         #TODO: DEBUGGING: Add GUI HOOKS
         if (state != ClassSM.STATE):
@@ -113,12 +176,43 @@ def exe_loop(accel_measure, data_rate, DQ, ClassSM, CT, TRAJ, logger_dict,
     else:
         logger_dict["logstates"].append("booting_up")
         logger_dict["steps"].append(0)
+        if PROF is not None:
+            PROF.lap('total', start_ns)
         return TRAJ.angle, TRAJ.sh_angle, state, CT.step_count
 
 
+def profiler_setup(params):
+    """
+    Make the latency profiler asked for by params
+
+    Rtn:
+        LatencyProfiler with a deadline of one sample period, or None if 
+        neither latency option is set
+    """
+    if not (params.get('latency', False) or params.get('latency_json')):
+        return None
+    return LatencyProfiler(deadline_ms=1e3/params.get('data_rate', 100),
+                           stages=('serial_wait', 'queue', 'classify', 
+                                   'cadence', 'trajectory', 'total'))
+
+
+def profiler_report(PROF, params):
+    """
+    Print the latency table and write the JSON report if asked for
+    """
+    if PROF is None:
+        return
+    PROF.report()
+    if params.get('latency_json'):
+        info = {key: val for key, val in params.items()
+                if isinstance(val, (str, int, float, bool, type(None)))}
+        PROF.save_json(params['latency_json'], info)
+        print(f"Latency report written to {params['latency_json']}")
+
+
 def sil_main(datafile, graph_title, params):
     # Set objects
-    DQ, ClassSM, CT, TRAJ = object_setup(params)
+    DQ, ClassSM, CT, TRAJ, SCHED = object_setup(params)
 
     # Get input rate
     data_rate = params.get('data_rate', 100)
@@ -126,7 +220,7 @@ def sil_main(datafile, graph_title, params):
     # Parse data file
     print(f"Data file: {datafile}")
     #filepath = os.path.join('data',datafile)
-    data_dict = parse_mt_file(datafile)
+    data_dict = parse_log_file(datafile)
 
     # Get time and data measurement
     time_steps = data_dict["Time_s"]
@@ -141,6 +235,7 @@ def sil_main(datafile, graph_title, params):
         logger_dict["theta2"] = []
 
     #Execution Loop
+    PROF = profiler_setup(params)
     state = 'unknown'
     step_count = 0
     for i in range(len(time_steps)):
@@ -149,7 +244,7 @@ def sil_main(datafile, graph_title, params):
         el_angle, sh_angle, state, step_count = exe_loop(accel_measure, data_rate, DQ, 
                                                 ClassSM, CT, TRAJ, logger_dict,
                                                 state, step_count, 
-                                                time_steps[i])
+                                                time_steps[i], SCHED, PROF)
         # TODO Add simple noise model to represent encoder precision
         TRAJ.angle = el_angle
         TRAJ.sh_angle = sh_angle
@@ -159,21 +254,258 @@ def sil_main(datafile, graph_title, params):
             logger_dict["theta1"].append(sh_angle*2*np.pi)
             logger_dict["theta2"].append(el_angle*2*np.pi)
 
+    profiler_report(PROF, params)
     return logger_dict
 
 
-def live_sil_main(port, params, baudrate=115200, gui_update_fcn=None):
+def offline_sil_main(datafile, graph_title, params):
+    """
+    Replay a logfile in batch. Classifier features for every window are 
+    computed from strided views and classified in one call; the cadence 
+    tracker and trajectory stages then run over the precomputed states. 
+    Produces the same logger_dict as sil_main
+    """
+    # Set objects
+    DQ, ClassSM, CT, TRAJ, SCHED = object_setup(params)
+
+    # Get input rate
+    data_rate = params.get('data_rate', 100)
+
+    # Parse data file
+    print(f"Data file: {datafile}")
+    data_dict = parse_log_file(datafile)
+    accel_measures = np.asarray(data_dict["AccM"], dtype=np.float64)
+    num_samples = len(accel_measures)
+
+    # Make return log for playback
+    logger_dict = {"logname": os.path.basename(datafile),
+                    "logstates": [],
+                    "theta1": [],
+                    "steps": []}
+    if params.get("double_pend", False):
+        logger_dict["theta2"] = []
+
+    # Windows seen by the execution loop, one per sample once the queue fills
+    window_size = DQ.num_entries(CT.TIME_WINDOW)
+    if num_samples >= window_size:
+        windows = np.lib.stride_tricks.sliding_window_view(accel_measures,
+                                                           window_size)
+    else:
+        windows = np.empty((0, window_size))
+
+    # Classify every hop and hold the state in between
+    class_hop = SCHED.hops['classify']
+    states = ClassSM.predict_windows(windows[::class_hop], data_rate)
+    states = np.repeat(states, class_hop)[:len(windows)]
+    SCHED.poll('classify')
+
+    #Execution Loop
+    for i in range(num_samples):
+        SCHED.tick()
+        win_idx = i - window_size + 1
+        if win_idx < 0:
+            logger_dict["logstates"].append("booting_up")
+            logger_dict["steps"].append(0)
+            el_angle, sh_angle = TRAJ.angle, TRAJ.sh_angle
+        else:
+            state = states[win_idx]
+            CT.walking = (state == 'walking')
+            num_new = SCHED.poll('cadence')
+            if num_new:
+                CT.update_cadence(windows[win_idx], num_new)
+            el_angle, sh_angle = TRAJ.get_pos_setpoint(CT.steps_per_window, 
+                                                       CT.TIME_WINDOW,
+                                                       CT.time_till_step)
+            logger_dict["logstates"].append(state)
+            logger_dict["steps"].append(CT.step_count)
+
+        TRAJ.angle = el_angle
+        TRAJ.sh_angle = sh_angle
+        if sh_angle is None:
+            logger_dict["theta1"].append(el_angle*2*np.pi)
+        else:
+            logger_dict["theta1"].append(sh_angle*2*np.pi)
+            logger_dict["theta2"].append(el_angle*2*np.pi)
+
+    return logger_dict
+
+
+def expand_sources(sources):
+    """
+    Expand directories and glob patterns into a sorted list of logfiles. Only
+    "MT" and "SIM" logfiles are picked from directories
+
+    Args:
+        list of strings sources - logfiles, directories or glob patterns
+    Rtn:
+        list of logfile paths without duplicates
+    """
+    logfiles = []
+    for source in sources:
+        if os.path.isdir(source):
+            matches = [os.path.join(source, f) for f in os.listdir(source) \
+                if os.path.isfile(os.path.join(source, f)) and \
+                    re.match(r"\A(MT|SIM)", f)]
+        else:
+            matches = glob.glob(source)
+        for match in sorted(matches):
+            if match not in logfiles:
+                logfiles.append(match)
+    return logfiles
+
+
+def _init_batch_worker(params, modeldata):
+    """
+    Set up a batch worker process with the run params and the classifier 
+    model loaded once by the parent process
+    """
+    global _BATCH_PARAMS
+    _BATCH_PARAMS = dict(params)
+    _BATCH_PARAMS['modelfile'] = modeldata
+    # Workers would race on one latency report
+    _BATCH_PARAMS['latency'] = False
+    _BATCH_PARAMS['latency_json'] = None
+
+
+def _replay_log(datafile):
+    """
+    Replay one logfile inside a batch worker and summarize the run. The
+    per-sample prints of the replay are discarded so workers do not 
+    interleave them with the summary table
+
+    Rtn:
+        dict with the logname, final step count, seconds spent in each state,
+        runtime of the replay (in seconds), and an error message if the 
+        replay failed
+    """
+    params = _BATCH_PARAMS
+    summary = {"logname": datafile, "steps": None, "states": {},
+               "runtime_s": 0.0, "error": ""}
+    start_time = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            if params.get('offline', False):
+                logger_dict = offline_sil_main(datafile, datafile, params)
+            else:
+                logger_dict = sil_main(datafile, datafile, params)
+        # One state is logged per sample of the log
+        sample_rate = parse_log_file(datafile)['SampleRate']
+    except Exception as err:
+        summary["error"] = f"{type(err).__name__}: {err}"
+    else:
+        # The step count is -1 until the cadence tracker first sees walking
+        summary["steps"] = max(0, logger_dict["steps"][-1]) \
+            if len(logger_dict["steps"]) > 0 else 0
+        states, counts = np.unique(logger_dict["logstates"], 
+                                   return_counts=True)
+        summary["states"] = {state: count/sample_rate \
+            for state, count in zip(states, counts)}
+    summary["runtime_s"] = time.perf_counter() - start_time
+    return summary
+
+
+def batch_sil_main(sources, params, workers=None, summary_file=None):
+    """
+    Replay many logfiles headlessly, one per worker process, and report a
+    summary table
+
+    Args:
+        list of strings sources - logfiles, directories or glob patterns
+        dict params - run params, see object_setup
+        int workers - number of worker processes; default None uses every 
+            core
+        string summary_file - if provided, the summary table is written to 
+            this csv file
+    Rtn:
+        list of summary dicts, one per logfile (see _replay_log)
+    """
+    logfiles = expand_sources(sources)
+    if len(logfiles) == 0:
+        print("No logfiles found")
+        return []
+
+    # Load the model once; workers get a read-only copy
+    modeldata = ClassifierSM.read_modelfile(params['modelfile'])
+
+    start_time = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, 
+                             initializer=_init_batch_worker,
+                             initargs=(params, modeldata)) as pool:
+        summaries = list(pool.map(_replay_log, logfiles))
+    total_time = time.perf_counter() - start_time
+
+    # Build summary table
+    state_names = sorted({state for summary in summaries \
+        for state in summary["states"]})
+    header = ["logname", "steps"] + [f"{state}_s" for state in state_names] \
+        + ["runtime_s", "error"]
+    rows = []
+    for summary in summaries:
+        row = [summary["logname"], summary["steps"]]
+        row += [summary["states"].get(state, 0.0) for state in state_names]
+        row += [round(summary["runtime_s"], 3), summary["error"]]
+        rows.append(row)
+
+    # Report
+    widths = [max(len(str(item)) for item in column) \
+        for column in zip(header, *rows)]
+    for row in [header] + rows:
+        print("  ".join(str(item).ljust(width) \
+            for item, width in zip(row, widths)).rstrip())
+    print(f"Replayed {len(logfiles)} logs in {total_time:.2f} s")
+
+    if summary_file is not None:
+        with open(summary_file, mode='w', newline='') as file:
+            csvwrite = csv.writer(file)
+            csvwrite.writerow(header)
+            csvwrite.writerows(rows)
+
+    return summaries
+
+
+def lag_skip(policy, behind, last):
+    """
+    Decide which stages a sample skips under the lag policy
+
+    Args:
+        tuple of strings policy - degradations allowed, from LAG_POLICIES
+        bool behind - True if the sample waited longer than the max lag
+        bool last - True if no newer sample is queued behind this one
+
+    Rtn:
+        tuple of stage names for exe_loop to skip; with coalesce the newest
+        sample always runs every stage, so skip_classify only applies when 
+        coalesce is off
+    """
+    if not behind:
+        return ()
+    if 'coalesce' in policy:
+        # A newer sample will refresh both stages with this one included
+        return () if last else ('classify', 'cadence')
+    if 'skip_classify' in policy:
+        return ('classify',)
+    return ()
+
+
+def live_sil_main(port, params, baudrate=115200, gui_update_fcn=None, 
+                  stop_event=None):
     # Set objects
-    DQ, ClassSM, CT, TRAJ = object_setup(params)
+    DQ, ClassSM, CT, TRAJ, SCHED = object_setup(params)
 
     # Get input rate
     data_rate = params.get('data_rate', 100)
 
-    # Set up serial port
-    ser = serial.Serial(port, baudrate)
+    # Set up serial port; samples are read on a background thread so the
+    # control loop never blocks on the port
+    from src import ImuInterface
+    imu = ImuInterface(data_rate, port, baudrate, 
+                       binary=params.get('binary_frames', False))
+    reader = SerialReader(imu, max_samples=params.get('serial_queue', 1024))
 
-    # Get time limit
+    # Get time limit; the loop also ends once stop_event is set
     time_limit = params.get('time_limit', 30.0)
+    if stop_event is None:
+        stop_event = threading.Event()
 
     # Logger dict for playback
     logger_dict = {"logname": "Live!",
@@ -183,37 +515,132 @@ def live_sil_main(port, params, baudrate=115200, gui_update_fcn=None):
     if params.get("double_pend", False):
         logger_dict["theta2"] = deque()
 
+    # Lag policy; a sample is behind when it waited longer than max_lag_ms
+    policy = params.get('lag_policy', LAG_POLICIES)
+    max_lag_ms = params.get('max_lag_ms', 3e3/data_rate)
+    LAG = LatencyProfiler(deadline_ms=max_lag_ms, stages=('lag',))
+    degraded = {'skip_classify': 0, 'coalesce': 0, 'drop_gui': 0}
+
     # Read IMU
+    PROF = profiler_setup(params)
     state = 'unknown'
     step_count = 0
+    el_angle = None
     infinite_loop = time_limit < 0
     start_time = time.time()
     running = True
-    while(infinite_loop | (time.time() - start_time < time_limit) \
-        and running):
-        ax, ay, az = read_imu(ser)
-        accel_measure = np.sqrt(
-            np.sum( np.power([float(ax), float(ay), float(az)], 2) ) 
-            )
-        el_angle, sh_angle, state, step_count = exe_loop(accel_measure, data_rate, DQ, 
-                                                ClassSM, CT, TRAJ, logger_dict,
-                                                state, step_count)
-        # TODO Add simple noise model to represent encoder precision
-        TRAJ.angle = el_angle
-        TRAJ.sh_angle = sh_angle
+    reader.start()
+    try:
+        while(infinite_loop | (time.time() - start_time < time_limit) \
+            and running and not stop_event.is_set()):
+            # Wait at most one sample period so the GUI keeps updating
+            reader.wait(timeout=1/data_rate)
+            if reader.error is not None:
+                raise reader.error
+            if not reader.running and reader.backlog == 0:
+                # The reader thread ended; nothing more will arrive
+                break
+
+            # Drain every sample that arrived since the last pass
+            batch = reader.drain()
+            for i, (arrival, values) in enumerate(batch):
+                # Time from the sample reaching the host to being processed
+                lag_ns = LAG.now() - int(arrival*1e9)
+                LAG.record('lag', lag_ns)
+                if PROF is not None:
+                    PROF.record('serial_wait', lag_ns)
+                skip = lag_skip(policy, lag_ns > max_lag_ms*1e6, 
+                                i == len(batch) - 1)
+                if 'cadence' in skip:
+                    degraded['coalesce'] += 1
+                elif 'classify' in skip:
+                    degraded['skip_classify'] += 1
+
+                ax, ay, az = values[:3]
+                accel_measure = np.sqrt(ax*ax + ay*ay + az*az)
+                el_angle, sh_angle, state, step_count = exe_loop(
+                    accel_measure, data_rate, DQ, ClassSM, CT, TRAJ, 
+                    logger_dict, state, step_count, SCHED=SCHED, PROF=PROF,
+                    skip=skip)
+                # TODO Add simple noise model to represent encoder precision
+                TRAJ.angle = el_angle
+                TRAJ.sh_angle = sh_angle
         
-        #Update Gui
-        if not params.get('headless', False):      
-            if sh_angle is None:
-                running = gui_update_fcn(ClassSM.STATE, 
-                                         CT.step_count, 
-                                         el_angle*2*np.pi)
-            else:
-                running = gui_update_fcn(ClassSM.STATE, 
-                                         CT.step_count, 
-                                         sh_angle*2*np.pi, 
-                                         el_angle*2*np.pi)
-    ser.close()
+            #Update Gui, unless the newest sample waited past the max lag
+            if not params.get('headless', False) and el_angle is not None:
+                if 'drop_gui' in policy and len(batch) > 0 and \
+                    LAG.now() - int(batch[-1][0]*1e9) > max_lag_ms*1e6:
+                    degraded['drop_gui'] += 1
+                elif sh_angle is None:
+                    running = gui_update_fcn(ClassSM.STATE, 
+                                             CT.step_count, 
+                                             el_angle*2*np.pi)
+                else:
+                    running = gui_update_fcn(ClassSM.STATE, 
+                                             CT.step_count, 
+                                             sh_angle*2*np.pi, 
+                                             el_angle*2*np.pi)
+    finally:
+        # Release the port even when the reader or the loop raised
+        reader.stop()
+        imu.close()
+    profiler_report(PROF, params)
+    if len(LAG.stages) > 0:
+        lag = LAG.summary()['stages']['lag']
+        print(f"Lag: p50 {lag['p50_us']/1e3:.1f}ms, p99 "
+              f"{lag['p99_us']/1e3:.1f}ms, max {lag['max_us']/1e3:.1f}ms, "
+              f"{lag['deadline_misses']} samples over {max_lag_ms:g}ms")
+        print(f"Degraded: {degraded['coalesce']} samples coalesced, "
+              f"{degraded['skip_classify']} classifications skipped, "
+              f"{degraded['drop_gui']} GUI frames dropped")
+    stats = imu.jitter_stats
+    print(f"Serial reader: {reader.num_samples} samples, "
+          f"{reader.overflows} overflows, {imu.bad_lines} bad lines")
+    print(f"Sample arrival: {stats['rate_Hz']:.1f}Hz, jitter "
+          f"{stats['jitter_ms']:.2f}ms, max gap {stats['max_gap_ms']:.1f}ms, "
+          f"{stats['late']} late")
+    decoder = imu.frame_decoder
+    if decoder is not None:
+        print(f"Binary frames: {decoder.dropped} dropped, "
+              f"{decoder.crc_errors} CRC errors, "
+              f"{decoder.skipped_bytes} bytes skipped")
+
+
+def import_report(num_modules=15):
+    """
+    Print where the startup time of run_sil goes and which heavy optional 
+    packages this process has imported. The breakdown is measured by 
+    importing run_sil in a fresh interpreter with python's -X importtime 
+
+    Args:
+        int num_modules - number of slowest modules to list
+    """
+    cmd = [sys.executable, '-X', 'importtime', '-c', 'import run_sil']
+    result = subprocess.run(cmd, capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    # Lines are "import time: self [us] | cumulative | <indent>module"
+    rows = []
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)", 
+                         line)
+        if match:
+            rows.append((int(match[2]), int(match[1]), len(match[3])//2, 
+                         match[4]))
+    if len(rows) == 0:
+        print(f"Import report failed: {result.stderr.strip()}")
+        return
+
+    total_us = max(row[0] for row in rows if row[3] == 'run_sil')
+    print(f"Importing run_sil takes {total_us/1e3:.1f}ms")
+    print(f"{'cumulative[ms]':>14} {'self[ms]':>9}  module")
+    for cumulative, self_us, depth, name in \
+        sorted(rows, reverse=True)[1:num_modules + 1]:
+        print(f"{cumulative/1e3:14.1f} {self_us/1e3:9.1f}  "
+              f"{'  '*depth}{name}")
+
+    loaded = [name for name in _HEAVY_MODULES if name in sys.modules]
+    print(f"Heavy packages loaded by this run: "
+          f"{', '.join(loaded) if loaded else 'none'}")
 
 
 def _check_threshold(arg):
@@ -231,10 +658,47 @@ def _check_threshold(arg):
         raise argparse.ArgumentTypeError(msg)
     return val
 
+
+def _check_hop(arg):
+    """
+    Argument parsing fcn that reads a hop size given in samples (e.g. '25') 
+    or seconds with an 's' suffix (e.g. '0.25s')
+    """
+    try:
+        if arg.endswith('s'):
+            hop = {'hop_s': float(arg[:-1])}
+            val = hop['hop_s']
+        else:
+            hop = {'hop_samples': int(arg)}
+            val = hop['hop_samples']
+    except ValueError as err:
+        raise argparse.ArgumentTypeError(str(err))
+
+    if val <= 0:
+        msg = f"Hop size must be positive. Recieved {arg}"
+        raise argparse.ArgumentTypeError(msg)
+    return hop
+
+
+def _check_policy(arg):
+    """
+    Argument parsing fcn that reads a comma separated list of lag policies
+    """
+    if arg == 'none':
+        return ()
+    policy = tuple(arg.split(','))
+    for name in policy:
+        if name not in LAG_POLICIES:
+            msg = f"Lag policies are {', '.join(LAG_POLICIES)} or none. " \
+                  f"Recieved {name}"
+            raise argparse.ArgumentTypeError(msg)
+    return policy
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Run software in the loop simulation')
     parser.add_argument('data_source', type=str, help="Source of accel data to test software with. \
-        use --port arg to specify IMU port, else use filepath to logfile")
+        use --port arg to specify IMU port, else use filepath to logfile. With --batch,\
+        a comma separated list of logfiles, directories, or glob patterns")
     parser.add_argument('modelfile', type=str, help="Model file of classifier to run with")
     parser.add_argument('-g', '--title', type=str, default="SIL Results", help="Graph title of SIL Results")
     parser.add_argument('-r', '--data_rate', type=int, default=100, 
@@ -248,44 +712,147 @@ if __name__ == "__main__":
     parser.add_argument('-m', '--method', type=str, default='indirect', choices=['direct', 'indirect'],
         help="Choose which method for counting steps; 'direct' counts acceleration pulses \
             while 'indirect' estimates with frequency analysis")
+    parser.add_argument('-f', '--filtering', type=str, default='zero_phase',
+        choices=['zero_phase', 'causal'],
+        help="Choose how the cadence tracker filters data; 'zero_phase' \
+            filters the whole window each update while 'causal' filters only \
+            the new samples and slides the indirect spectrum by them")
+    parser.add_argument('-k', '--peak_detection', type=str, default='window',
+        choices=['window', 'online'],
+        help="Choose how the cadence tracker finds steps; 'window' searches \
+            the whole window each update while 'online' detects steps sample \
+            by sample. 'online' requires causal filtering")
     parser.add_argument('-p', '--port', action='store_true', help="Port to connect to the IMU")
     parser.add_argument("-t", "--time_limit", type=float, default=30.0, 
         help="Only applies to live run, time_limit of the run. For an endless\
              run, set time_limit negative")
+    parser.add_argument("--serial_queue", type=int, default=1024,
+        help="Only applies to live run, number of IMU samples the serial \
+            reader thread buffers before dropping the oldest")
+    parser.add_argument("--lag_policy", type=_check_policy, 
+        default=LAG_POLICIES,
+        help="Only applies to live run, comma separated degradations to apply\
+            while samples wait longer than --max_lag: 'skip_classify' holds \
+            the activity state, 'coalesce' refreshes classifier and cadence \
+            only on the newest queued sample, 'drop_gui' skips GUI updates. \
+            'coalesce' takes precedence over 'skip_classify' on the newest \
+            sample. 'none' disables them. Default all three")
+    parser.add_argument("--max_lag", type=float, default=None,
+        help="Only applies to live run, milliseconds a sample may wait before\
+            the loop counts as behind; default three sample periods")
+    parser.add_argument("--fps", type=int, default=60,
+        help="Only applies to live run with the gui, max frame rate the gui \
+            draws at")
+    parser.add_argument("--binary", action='store_true',
+        help="Only applies to live run, decode the binary frames sent by \
+            firmware built with IMU_BINARY_FRAMES instead of text lines")
     parser.add_argument("-l", "--look_up", action='store_true', 
         help="Flag in order to use the trajectory look-up table instead of the\
             trajectory spline generator")
+    parser.add_argument("--speed_grid", type=float, default=None,
+        help="Only applies with --look_up. Precompute blended trajectories \
+            every SPEED_GRID m/s (e.g. 0.01) and serve setpoints from the \
+            table; the row changes once the speed estimate moves more than \
+            one grid step")
     parser.add_argument("-d", "--double_pend", action='store_true', 
         help="Use the double pendulum model. This can only be used with \
             trajectory spline generator (the look_up option is ignored")
     parser.add_argument("-i", "--headless", action='store_true', 
         help="Run the live sil without gui")
+    parser.add_argument("-s", "--streaming", action='store_true', 
+        help="Extract classifier features with the sliding spectral estimator\
+            instead of recomputing welch over the window every sample")
+    parser.add_argument("-o", "--offline", action='store_true', 
+        help="Replay the logfile with the batch engine, which classifies \
+            every window in one call instead of sample by sample")
+    parser.add_argument("-b", "--batch", action='store_true', 
+        help="Replay every logfile in data_source headlessly in worker \
+            processes and print a summary table")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+        help="Number of worker processes for batch replay; defaults to the \
+            number of cores")
+    parser.add_argument("--summary", type=str, default=None,
+        help="Write the batch replay summary table to this csv file")
+    parser.add_argument("--class_hop", type=_check_hop, default={},
+        help="How often the classifier refreshes, in samples (e.g. 25) or \
+            seconds (e.g. 0.25s); the last state is held in between")
+    parser.add_argument("--cadence_hop", type=_check_hop, default={},
+        help="How often the cadence tracker refreshes, in samples (e.g. 5) or\
+            seconds (e.g. 0.05s); the last cadence is held in between")
+    parser.add_argument("--latency", action='store_true',
+        help="Time each stage of the execution loop and print the latency \
+            percentiles and deadline misses after a playback or live run")
+    parser.add_argument("--latency_json", type=str, default=None,
+        help="Time each stage of the execution loop and write the latency \
+            histograms to this json file")
+    parser.add_argument("--import_report", action='store_true',
+        help="After the run, print the slowest imports of run_sil and the \
+            heavy optional packages the run loaded")
     
     args = parser.parse_args()
     params = {'data_rate': args.data_rate,
               'dq_window': args.queue_window,
               'modelfile': args.modelfile,
               'threshold': args.threshold,
+              'csm_streaming': args.streaming,
               'csm_window': args.window,
+              'csm_hop': args.class_hop,
               'ct_window': args.window,
               'ct_method': args.method,
+              'ct_filtering': args.filtering,
+              'ct_peak_detection': args.peak_detection,
+              'ct_hop': args.cadence_hop,
               'time_limit': args.time_limit,
+              'serial_queue': args.serial_queue,
+              'binary_frames': args.binary,
+              'lag_policy': args.lag_policy,
+              'max_lag_ms': args.max_lag or 3e3/args.data_rate,
               'use_lookup': args.look_up and (not args.double_pend),
+              'traj_speed_grid': args.speed_grid,
               "double_pend": args.double_pend,
-              "headless": args.headless}
+              "headless": args.headless,
+              "offline": args.offline,
+              "latency": args.latency,
+              "latency_json": args.latency_json}
     
 
-    if args.port:
+    if args.batch:
+        # headless replay of many logfiles
+        batch_sil_main(args.data_source.split(','), params, args.jobs, 
+                       args.summary)
+    elif args.port:
         # live operation
         if args.headless:
             live_sil_main(args.data_source, params)
         else:
+            from src import PendulumGUI
             app = PendulumGUI(double_pend=args.double_pend, live=True)
             app.setup_live()
-            live_sil_main(args.data_source, params, gui_update_fcn=app.live_update)
+            # The control loop runs on a worker thread and publishes its 
+            # state; the gui draws the latest state at its own frame rate
+            stop = threading.Event()
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                control = executor.submit(live_sil_main, args.data_source,
+                                          params, gui_update_fcn=app.publish,
+                                          stop_event=stop)
+                try:
+                    app.run_live(lambda: not control.done(), fps=args.fps)
+                finally:
+                    # Stop the control loop too if the gui exits on Ctrl+C 
+                    # or an error, so the executor does not wait on it
+                    stop.set()
+                control.result()
             app.await_death()
     else:
         # playback from logfile
-        logger_dict = sil_main(args.data_source, args.title, params)
+        if args.offline:
+            logger_dict = offline_sil_main(args.data_source, args.title, 
+                                           params)
+        else:
+            logger_dict = sil_main(args.data_source, args.title, params)
+        from src import PendulumGUI
         app = PendulumGUI(double_pend=args.double_pend)
-        app.run_playback(logger_dict)
\ No newline at end of file
+        app.run_playback(logger_dict)
+
+    if args.import_report:
+        import_report()
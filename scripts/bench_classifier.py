@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+
+# Benchmark the per-call latency of ClassifierSM.predict against the old
+# DataFrame based inference path
+
+# Python import
+import argparse
+import os
+import sys
+import time
+
+# Add Project root for imports
+FILE_PATH = sys.path[0]
+ROOT_PATH = os.path.join(FILE_PATH, '..')
+sys.path.append(ROOT_PATH)
+
+# Project Import
+from src import ClassifierSM
+from utils import calc_features, parse_log_file
+
+# 3rd-party import
+import joblib
+import numpy as np
+import pandas as pd
+
+
+def dataframe_predict(model, data, sample_rate):
+    """
+    Inference path used before ClassifierSM fed bare NumPy rows: the features
+    are packed into a single row DataFrame for every call
+
+    Args:
+        sklearn classifier model - classifier fitted with feature names
+        np.array data - window of acceleration magnitudes
+        num sample_rate - sample rate of the data
+
+    Rtn:
+        np.array of class probabilities
+    """
+    dom_freq, intensity, periodicity = calc_features(data, sample_rate)
+    feat_df = pd.DataFrame({"DomFreq": dom_freq,
+                            "Intensity": intensity,
+                            "Periodicity": periodicity})
+    return model.predict_proba(feat_df)[0]
+
+
+def time_calls(fcn, windows):
+    """
+    Call fcn on each window and return the per-call latencies in microseconds
+    """
+    latencies = np.zeros(len(windows))
+    for i, window in enumerate(windows):
+        start = time.perf_counter()
+        fcn(window)
+        latencies[i] = time.perf_counter() - start
+    return latencies*1e6
+
+
+def report(name, latencies):
+    """
+    Print summary stats of latencies in microseconds
+    """
+    print(f"{name:<28} median {np.median(latencies):8.1f}us  "
+          f"p95 {np.percentile(latencies, 95):8.1f}us  "
+          f"mean {np.mean(latencies):8.1f}us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark ClassifierSM \
+        inference latency")
+    parser.add_argument("-m", "--modelfile", type=str,
+        default=os.path.join(ROOT_PATH, 'models/RKS_FINAL_BIN.joblib'),
+        help="Classifier model to benchmark")
+    parser.add_argument("-f", "--logfile", type=str,
+        default=os.path.join(ROOT_PATH,
+                             'data/cadence_test_data/MT_RKS_switch_10_12.txt'),
+        help="Logfile to draw windows from")
+    parser.add_argument("-w", "--window", type=float, default=3.5,
+        help="Window length in seconds")
+    parser.add_argument("-n", "--num_calls", type=int, default=2000,
+        help="Number of predict calls to time")
+    args = parser.parse_args()
+
+    data_dict = parse_log_file(args.logfile)
+    fs = data_dict['SampleRate']
+    accel_data = np.asarray(data_dict['AccM'])
+    nPts = int(args.window*fs)
+    num_calls = min(args.num_calls, len(accel_data) - nPts)
+    windows = [accel_data[i:i + nPts] for i in range(num_calls)]
+
+    modeldata = joblib.load(args.modelfile)
+    model = modeldata['modeldata']['model']
+    ClassSM = ClassifierSM(modeldata, time_window=args.window)
+    feat_row = np.zeros((1, 3))
+    feat_df = pd.DataFrame({"DomFreq": [0.0], "Intensity": [0.0],
+                            "Periodicity": [0.0]})
+
+    print(f"{num_calls} calls, {nPts} sample windows, "
+          f"{ClassSM.classifier_name}")
+    report("features only",
+           time_calls(lambda x: calc_features(x, fs), windows))
+    report("DataFrame construction",
+           time_calls(lambda x: pd.DataFrame({"DomFreq": [x[0]],
+                                              "Intensity": [x[1]],
+                                              "Periodicity": [x[2]]}),
+                      windows))
+    report("predict_proba(DataFrame)",
+           time_calls(lambda x: model.predict_proba(feat_df), windows))
+    report("predict_proba(np row)",
+           time_calls(lambda x: ClassSM._model.predict_proba(feat_row),
+                      windows))
+    before = time_calls(lambda x: dataframe_predict(model, x, fs), windows)
+    after = time_calls(lambda x: ClassSM.predict(x, fs), windows)
+    report("before: DataFrame predict", before)
+    report("after: ClassifierSM.predict", after)
+    print(f"speedup (median) {np.median(before)/np.median(after):.2f}x")
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+
+# Benchmark suite for the SIL pipeline. Every stage of the per-sample path is
+# timed over the bundled cadence test logs and compared against stored
+# baselines; a benchmark slower than its baseline by more than the threshold
+# is a regression and makes the script exit with status 1. Times are compared
+# relative to a calibration workload run alongside each benchmark, so a
+# machine that is busier or clocked differently than when the baselines were
+# stored does not read as a regression, e.g.
+#   ./scripts/bench_sil.py                 # compare against the baselines
+#   ./scripts/bench_sil.py --save          # store new baselines
+#   ./scripts/bench_sil.py -k cadence      # only the cadence benchmarks
+
+# Python import
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import platform
+import sys
+import time
+
+# Add Project root for imports
+FILE_PATH = sys.path[0]
+ROOT_PATH = os.path.join(FILE_PATH, '..')
+sys.path.append(ROOT_PATH)
+
+# Project Import
+import run_sil
+from utils import calc_features, parse_log_file
+
+# 3rd-party import
+import numpy as np
+import scipy
+
+BASELINE_FILE = os.path.join(ROOT_PATH, 'data/bench_baseline.json')
+LOG_DIR = os.path.join(ROOT_PATH, 'data/cadence_test_data')
+BENCH_LOG = os.path.join(LOG_DIR, 'MT_RKS_switch_10_12.txt')
+MODELFILE = os.path.join(ROOT_PATH, 'models/RKS_FINAL_BIN.npz')
+MIN_RUN_S = 0.05     # Shortest timed run of a benchmark
+
+
+def make_params(**kwargs):
+    """
+    Return the run_sil params used by every benchmark, updated by kwargs
+    """
+    params = {'modelfile': MODELFILE, 'data_rate': 100, 'dq_window': 4.0,
+              'csm_window': 3.5, 'ct_window': 3.5}
+    params.update(kwargs)
+    return params
+
+
+def load_windows(window_s=3.5, data_rate=100):
+    """
+    Return the acceleration magnitudes of the benchmark log and the windows
+    the execution loop sees, one per sample once the queue fills
+    """
+    accel = np.asarray(parse_log_file(BENCH_LOG)['AccM'], dtype=np.float64)
+    windows = np.lib.stride_tricks.sliding_window_view(
+        accel, int(window_s*data_rate))
+    return accel, windows
+
+
+# Benchmarks. Each one does its setup and returns a fcn that runs the timed
+# work once, and the number of operations that work holds
+def bench_queue():
+    """
+    DataQueue append and get_latest_entries, per sample
+    """
+    accel, _ = load_windows()
+    def run():
+        DQ = run_sil.object_setup(make_params())[0]
+        for val in accel:
+            DQ.append(val)
+            DQ.get_latest_entries(3.5)
+    return run, len(accel)
+
+
+def bench_features():
+    """
+    calc_features of one window, per window
+    """
+    _, windows = load_windows()
+    windows = windows[::10]
+    def run():
+        for window in windows:
+            calc_features(window, 100)
+    return run, len(windows)
+
+
+def bench_features_batch():
+    """
+    calc_features of every window in one call, per window
+    """
+    _, windows = load_windows()
+    def run():
+        calc_features(windows, 100)
+    return run, len(windows)
+
+
+def bench_classify():
+    """
+    ClassifierSM.predict of one window, per window
+    """
+    _, windows = load_windows()
+    windows = windows[::10]
+    ClassSM = run_sil.object_setup(make_params())[1]
+    def run():
+        for window in windows:
+            ClassSM.predict(window, 100)
+    return run, len(windows)
+
+
+def _bench_cadence(method):
+    """
+    CadenceTracker.update_cadence of every window with a cadence method
+    """
+    _, windows = load_windows()
+    def run():
+        CT = run_sil.object_setup(make_params(ct_method=method))[2]
+        CT.walking = True
+        for window in windows:
+            CT.update_cadence(window)
+    return run, len(windows)
+
+
+def bench_cadence_direct():
+    """
+    CadenceTracker.update_cadence with the direct method, per window
+    """
+    return _bench_cadence('direct')
+
+
+def bench_cadence_indirect():
+    """
+    CadenceTracker.update_cadence with the indirect method, per window
+    """
+    return _bench_cadence('indirect')
+
+
+def _bench_trajectory(**kwargs):
+    """
+    get_pos_setpoint of a trajectory generator, fed the cadence estimates of
+    the benchmark log
+    """
+    _, windows = load_windows()
+    CT = run_sil.object_setup(make_params())[2]
+    CT.walking = True
+    cadence = []
+    for window in windows:
+        CT.update_cadence(window)
+        cadence.append((CT.steps_per_window, CT.time_till_step))
+    def run():
+        TRAJ = run_sil.object_setup(make_params(**kwargs))[3]
+        for spw, tts in cadence:
+            el_angle, sh_angle = TRAJ.get_pos_setpoint(spw, 3.5, tts)
+            TRAJ.angle = el_angle
+            TRAJ.sh_angle = sh_angle
+    return run, len(cadence)
+
+
+def bench_traj_spline():
+    """
+    TrajectorySplineGenerator.get_pos_setpoint, per sample
+    """
+    return _bench_trajectory()
+
+
+def bench_traj_spline_double():
+    """
+    TrajectorySplineGenerator.get_pos_setpoint of the double pendulum, per
+    sample
+    """
+    return _bench_trajectory(double_pend=True)
+
+
+def bench_traj_lookup():
+    """
+    TrajectoryLookUp.get_pos_setpoint, per sample
+    """
+    return _bench_trajectory(use_lookup=True)
+
+
+def bench_parse():
+    """
+    parse_log_file of every bundled cadence log without the cache, per log
+    """
+    logfiles = sorted(glob.glob(os.path.join(LOG_DIR, '*.txt')))
+    def run():
+        for logfile in logfiles:
+            parse_log_file(logfile, use_cache=False)
+    return run, len(logfiles)
+
+
+def bench_parse_cached():
+    """
+    parse_log_file of every bundled cadence log from the cache, per log
+    """
+    logfiles = sorted(glob.glob(os.path.join(LOG_DIR, '*.txt')))
+    def run():
+        for logfile in logfiles:
+            parse_log_file(logfile)
+    run()
+    return run, len(logfiles)
+
+
+def bench_sil_main():
+    """
+    Full sil_main replay of every bundled cadence log, per sample
+    """
+    logfiles = sorted(glob.glob(os.path.join(LOG_DIR, '*.txt')))
+    num_samples = sum(len(parse_log_file(logfile)['AccM'])
+                      for logfile in logfiles)
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            for logfile in logfiles:
+                run_sil.sil_main(logfile, '', make_params())
+    return run, num_samples
+
+
+BENCHMARKS = {'queue': bench_queue,
+              'features': bench_features,
+              'features_batch': bench_features_batch,
+              'classify': bench_classify,
+              'cadence_direct': bench_cadence_direct,
+              'cadence_indirect': bench_cadence_indirect,
+              'traj_spline': bench_traj_spline,
+              'traj_spline_double': bench_traj_spline_double,
+              'traj_lookup': bench_traj_lookup,
+              'parse': bench_parse,
+              'parse_cached': bench_parse_cached,
+              'sil_main': bench_sil_main}
+
+
+def calibration_run():
+    """
+    Fixed reference work, a mix of small NumPy calls and python loops like 
+    the per-sample path, used to measure how fast the machine is right now
+    """
+    data = np.arange(350, dtype=np.float64)
+    total = 0.0
+    for i in range(2000):
+        total += float(np.sum(data*i))
+        total += sum(range(50))
+    return total
+
+
+def time_benchmark(bench_fcn, repeat):
+    """
+    Run a benchmark repeat times, each run next to a calibration run
+
+    Args:
+        fcn bench_fcn - benchmark setup fcn
+        int repeat - number of timed runs
+
+    Rtn:
+        tuple of (float microseconds per operation of the fastest run, float
+        calibrated score); the score is the fastest run time per operation 
+        divided by the fastest calibration time, so both sides keep only the
+        run least disturbed by the rest of the machine
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        run, num_ops = bench_fcn()
+
+    # Loop short benchmarks so a timed run lasts at least MIN_RUN_S and the 
+    # timer and scheduler noise stay small next to it
+    start = time.perf_counter()
+    run()
+    loops = max(1, int(np.ceil(MIN_RUN_S/(time.perf_counter() - start))))
+
+    times = []
+    calib_times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        calibration_run()
+        calib_times.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        for _ in range(loops):
+            run()
+        times.append(time.perf_counter() - start)
+    best = min(times)/loops/num_ops
+    return best*1e6, best/min(calib_times)
+
+
+def machine_info():
+    """
+    Return a description of the machine and library versions
+    """
+    return {'machine': platform.machine(),
+            'processor': platform.processor(),
+            'system': platform.platform(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'scipy': scipy.__version__}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the SIL pipeline \
+        and compare against stored baselines")
+    parser.add_argument("-k", "--filter", type=str, default=None,
+        help="Only run benchmarks whose name contains this string")
+    parser.add_argument("-r", "--repeat", type=int, default=7,
+        help="Timed runs per benchmark; the fastest is kept and compared \
+            against the fastest calibration run")
+    parser.add_argument("-t", "--threshold", type=float, default=0.25,
+        help="Fraction slower than the baseline that counts as a regression")
+    parser.add_argument("-b", "--baseline", type=str, default=BASELINE_FILE,
+        help="Baseline json file")
+    parser.add_argument("-s", "--save", action='store_true',
+        help="Store the results as the new baselines instead of comparing")
+    args = parser.parse_args()
+
+    # object_setup reads the trajectory templates relative to the root
+    os.chdir(ROOT_PATH)
+    names = [name for name in BENCHMARKS
+             if args.filter is None or args.filter in name]
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as json_file:
+            baseline = json.load(json_file)
+    base_results = baseline.get('results', {})
+
+    results = {}
+    scores = {}
+    regressions = []
+    base_scores = baseline.get('scores', {})
+    print(f"{'benchmark':<20}{'us/op':>12}{'baseline':>12}{'ratio':>8}")
+    for name in names:
+        results[name], scores[name] = time_benchmark(BENCHMARKS[name], 
+                                                     args.repeat)
+        line = f"{name:<20}{results[name]:>12.2f}"
+        if name in base_scores and not args.save:
+            # The ratio of calibrated scores, not of raw times
+            ratio = scores[name]/base_scores[name]
+            flag = ''
+            if ratio > 1 + args.threshold:
+                regressions.append(name)
+                flag = '  REGRESSION'
+            line += f"{base_results[name]:>12.2f}{ratio:>8.2f}{flag}"
+        print(line, flush=True)
+
+    if args.save:
+        base_results.update(results)
+        base_scores.update(scores)
+        baseline = {'info': machine_info(), 'results': base_results,
+                    'scores': base_scores}
+        with open(args.baseline, 'w') as json_file:
+            json.dump(baseline, json_file, indent=2)
+        print(f"Baselines written to {args.baseline}")
+    elif len(regressions) > 0:
+        print(f"{len(regressions)} regression(s) over "
+              f"{args.threshold*100:.0f}%: {', '.join(regressions)}")
+        sys.exit(1)
+    elif len(base_scores) > 0:
+        print(f"No regressions over {args.threshold*100:.0f}%")
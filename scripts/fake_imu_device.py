@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+
+# Stand in for the pico: replay a logfile over a pseudo-terminal as ASCII
+# lines or binary frames so live mode can run without the hardware, e.g.
+#   ./scripts/fake_imu_device.py --binary
+#   ./run_sil.py -p -i --binary <printed port> models/RKS_FINAL_BIN.npz
+
+# Python import
+import argparse
+import os
+import pty
+import sys
+import time
+import tty
+
+# Add Project root for imports
+FILE_PATH = sys.path[0]
+ROOT_PATH = os.path.join(FILE_PATH, '..')
+sys.path.append(ROOT_PATH)
+
+# Project Import
+from src import FrameDecoder
+from utils import parse_log_file
+
+# 3rd-party import
+import numpy as np
+
+# Raw counts per unit, matching the firmware's ACCEL_CONV and GYRO_CONV
+ACCEL_CONV = 0.000598
+GYRO_CONV = 0.01527
+
+
+def encode_samples(accel, binary=False, drop_every=0):
+    """
+    Encode accelerations the way the firmware sends them
+
+    Args:
+        2-D np.array accel - accelerations in m/s/s, one row per sample
+        bool binary - encode binary frames instead of ASCII lines
+        int drop_every - leave out every nth binary frame to simulate lost
+            samples; 0 keeps them all
+
+    Rtn:
+        list of bytes, one entry per sample; lost samples are empty
+    """
+    if not binary:
+        return [f"{ax:f} {ay:f} {az:f}\n".encode() for ax, ay, az in accel]
+
+    accel_raw = np.clip(np.round(accel/ACCEL_CONV), -32768, 32767)
+    gyro_raw = np.zeros_like(accel_raw)
+    frames = FrameDecoder.encode(np.arange(len(accel)), accel_raw, gyro_raw)
+    size = FrameDecoder.FRAME_SIZE
+    samples = [frames[i*size:(i + 1)*size] for i in range(len(accel))]
+    if drop_every > 0:
+        for i in range(drop_every - 1, len(samples), drop_every):
+            samples[i] = b''
+    return samples
+
+
+def write_samples(fd, samples, data_rate=100, loop=False):
+    """
+    Write encoded samples to a file descriptor, paced like the pico's timer
+
+    Args:
+        int fd - file descriptor of the pseudo-terminal master
+        list of bytes samples - encoded samples, see encode_samples
+        float data_rate - samples written per second
+        bool loop - replay the samples forever
+    """
+    period = 1/data_rate
+    while True:
+        next_time = time.monotonic()
+        for sample in samples:
+            os.write(fd, sample)
+            next_time += period
+            time.sleep(max(0.0, next_time - time.monotonic()))
+        if not loop:
+            break
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a logfile over a \
+        pseudo-terminal as a fake IMU")
+    parser.add_argument("-f", "--logfile", type=str,
+        default=os.path.join(ROOT_PATH,
+                             'data/cadence_test_data/MT_RKS_switch_10_12.txt'),
+        help="Logfile to replay")
+    parser.add_argument("-r", "--data_rate", type=float, default=100,
+        help="Samples sent per second")
+    parser.add_argument("-b", "--binary", action='store_true',
+        help="Send binary frames instead of ASCII lines")
+    parser.add_argument("--drop_every", type=int, default=0,
+        help="Only applies to binary, skip every nth frame")
+    parser.add_argument("--loop", action='store_true',
+        help="Replay the logfile forever")
+    args = parser.parse_args()
+
+    data_dict = parse_log_file(args.logfile)
+    accel = np.column_stack((data_dict['AccX'], data_dict['AccY'],
+                             data_dict['AccZ']))
+    samples = encode_samples(accel, args.binary, args.drop_every)
+    num_bytes = sum(len(sample) for sample in samples)
+    print(f"{len(samples)} samples, {num_bytes/len(samples):.1f} bytes per "
+          f"sample")
+
+    master, slave = pty.openpty()
+    tty.setraw(slave)
+    print(f"Fake IMU on {os.ttyname(slave)}", flush=True)
+
+    try:
+        write_samples(master, samples, args.data_rate, args.loop)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        os.close(master)
+        os.close(slave)
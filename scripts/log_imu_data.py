@@ -12,11 +12,12 @@ ROOT_PATH = os.path.join(FILE_PATH, '..')
 sys.path.append(ROOT_PATH)
 
 # Project import
-from utils import create_simple_file, read_imu
+from src import ImuInterface
+from utils import create_simple_file
 
 # 3rd party imports
+import numpy as np
 import pandas as pd
-import serial
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Log IMU data into simple \
@@ -36,36 +37,40 @@ if __name__ == "__main__":
 
     args = parser.parse_args()
     #Log data
-    frame = 1
-    time_arr = []
-    accx = []
-    accy = []
-    accz = []
+    samples = []
+    num_samples = 0
     time_limit = args.time_limit - (1/args.sample_rate)
     input("Hit Enter to start logging")
 
-    ser = serial.Serial(args.port, args.baudrate)
-    print(f"Talking to {ser.name}")
+    imu = ImuInterface(args.sample_rate, args.port, args.baudrate)
     start_time = time.time()
     time_diff = 0
 
+    # Take every sample waiting on the port at once
     while(time_diff < time_limit):
+        batch = imu.read_batch()
         time_diff = time.time() - start_time
-        time_arr.append(time_diff)
-        ax, ay, az = read_imu(ser)
-        accx.append(ax)
-        accy.append(ay)
-        accz.append(az)
-        frame += 1
+        if len(batch) > 0:
+            samples.append(batch)
+            num_samples += len(batch)
 
-    ser.close()
-    print("Done reading")
+    imu.close()
+    if num_samples == 0:
+        print(f"No samples read from {args.port} in {args.time_limit}s; "
+              f"no logfile created")
+        sys.exit(1)
+    stats = imu.jitter_stats
+    print(f"Done reading: {stats['rate_Hz']:.1f}Hz, jitter "
+          f"{stats['jitter_ms']:.2f}ms, max gap {stats['max_gap_ms']:.1f}ms")
+    accel = np.concatenate(samples)
     df = pd.DataFrame()
-    df['Frames#'] = [i for i in range(1, frame)]
-    df['Time'] = time_arr
-    df['AccX'] = accx
-    df['AccY'] = accy
-    df['AccZ'] = accz
+    df['Frames#'] = [i for i in range(1, num_samples + 1)]
+    # The pico paces the samples, so stamp each one by its index instead of
+    # the host arrival time; samples read in one batch arrive together
+    df['Time'] = np.arange(num_samples)/args.sample_rate
+    df['AccX'] = accel[:, 0]
+    df['AccY'] = accel[:, 1]
+    df['AccZ'] = accel[:, 2]
 
     create_simple_file(args.logfile, args.action, args.sample_rate, df)
-    print(f"File {args.logfile} is created")
\ No newline at end of file
+    print(f"File {args.logfile} is created")
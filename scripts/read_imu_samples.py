@@ -11,25 +11,22 @@ ROOT_PATH = os.path.join(FILE_PATH, '..')
 sys.path.append(ROOT_PATH)
 
 # Project import
-from utils import read_imu
+from src import ImuInterface
 
 # 3rd party imports
-import matplotlib.pyplot as plt 
 import numpy as np
-import serial
 
-ser = serial.Serial('/dev/ttyACM0',115200)
-print('Talking to pico: ')
-print(ser.name)
+imu = ImuInterface(100, '/dev/ttyACM0', 115200)
 
 read_samples = 30 # anything bigger than 1 to start out
 
 time_arr = []
 while read_samples > 0:
+    data = imu.read()
     time_arr.append(time.time())
-    data = read_imu(ser, debug=True)
+    print(data)
     read_samples -= 1
-ser.close()
+imu.close()
 
 print('Data collection complete')
 time_arr = np.array(time_arr)
@@ -39,5 +36,6 @@ print(f"Mean time diff {time_diff.mean()}")
 print(time_arr)
 print(time_diff)
 print(time_log)
-
-
+stats = imu.jitter_stats
+print(f"Sample arrival: {stats['rate_Hz']:.1f}Hz, jitter "
+      f"{stats['jitter_ms']:.2f}ms, max gap {stats['max_gap_ms']:.1f}ms")
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+
+# Check the mirrored ring buffer of DataQueue against a plain deque
+
+# Python import
+import argparse
+from collections import deque
+import os
+import sys
+
+# Add Project root for imports
+FILE_PATH = sys.path[0]
+ROOT_PATH = os.path.join(FILE_PATH, '..')
+sys.path.append(ROOT_PATH)
+
+# Project Import
+from src import DataQueue
+
+# 3rd-party import
+import numpy as np
+
+
+def compare(queue, reference, rng):
+    """
+    Compare the queue against the reference deque: the length, the latest
+    entries for a random and the full count, and None for one too many
+
+    Args:
+        DataQueue queue - queue under test
+        deque reference - deque holding the same entries
+        np.random.Generator rng - random source
+
+    Rtn:
+        list of strings describing each mismatch
+    """
+    errors = []
+    expected = np.array(reference, dtype=np.float64)
+    if len(queue) != len(expected):
+        errors.append(f"len {len(queue)}, expected {len(expected)}")
+        return errors
+    for num in (int(rng.integers(0, len(expected) + 1)), len(expected)):
+        entries = queue.get_entries(num)
+        if entries is None or \
+            not np.array_equal(entries, expected[len(expected) - num:]):
+            errors.append(f"get_entries({num}) differs")
+    if queue.get_entries(len(expected) + 1) is not None:
+        errors.append(f"get_entries({len(expected) + 1}) is not None")
+    return errors
+
+
+def append_all(queue, reference, values, rng):
+    """
+    Append values one at a time to both the queue and the reference deque,
+    comparing them after each append
+
+    Rtn:
+        list of strings describing each mismatch
+    """
+    errors = []
+    for value in values:
+        queue.append(value)
+        reference.append(value)
+        errors += compare(queue, reference, rng)
+    return errors
+
+
+def report(name, errors):
+    """
+    Print the result of a case
+
+    Rtn:
+        bool True if there were no errors
+    """
+    print(f"{name:<14}{'ok' if not errors else 'FAILED'}")
+    for error in errors[:5]:
+        print(f"    {error}")
+    return not errors
+
+
+def case_wraparound(rng, data_rate, time_window):
+    """
+    Fill the queue, then keep appending for several passes of the whole
+    mirrored buffer
+    """
+    queue = DataQueue(data_rate, time_window)
+    reference = deque(maxlen=queue._size)
+    values = rng.normal(size=5*2*queue._size + 3)
+    return report("wraparound", append_all(queue, reference, values, rng))
+
+
+def case_initial_data(rng, data_rate, time_window):
+    """
+    Initial data shorter and longer than the queue keeps its latest entries,
+    and appends continue from there
+    """
+    errors = []
+    size = int(np.ceil(time_window*data_rate))
+    for num in (size//3, size, 3*size + 1):
+        data = rng.normal(size=num)
+        queue = DataQueue(data_rate, time_window, data)
+        reference = deque(data, maxlen=size)
+        errors += compare(queue, reference, rng)
+        errors += append_all(queue, reference, rng.normal(size=size + 7), rng)
+    return report("initial_data", errors)
+
+
+def case_time_limit(rng, data_rate, time_window):
+    """
+    Shrinking and growing the time limit reallocates the buffer, keeps the
+    latest entries that fit, and appends continue from there
+    """
+    errors = []
+    queue = DataQueue(data_rate, time_window)
+    reference = deque(maxlen=queue._size)
+    errors += append_all(queue, reference,
+                         rng.normal(size=queue._size + 11), rng)
+    for limit in (time_window/3, time_window*2, time_window):
+        queue.time_limit = limit
+        size = int(np.ceil(limit*data_rate))
+        reference = deque(reference, maxlen=size)
+        if queue.time_limit != limit or len(queue._buffer) != 2*size:
+            errors.append(f"time_limit {limit} did not reallocate to {size}")
+        errors += compare(queue, reference, rng)
+        errors += append_all(queue, reference,
+                             rng.normal(size=int(1.5*size)), rng)
+    return report("time_limit", errors)
+
+
+def case_read_only(rng, data_rate, time_window):
+    """
+    The returned views can not be written to, so a caller can not corrupt
+    the queue through them
+    """
+    errors = []
+    queue = DataQueue(data_rate, time_window, rng.normal(size=50))
+    before = np.array(queue.get_entries(len(queue)))
+    for entries in (queue.get_entries(len(queue)//2 + 1),
+                    queue.get_entries(len(queue))):
+        try:
+            entries[0] = 1e9
+            errors.append("view is writeable")
+        except ValueError:
+            pass
+    if not np.array_equal(queue.get_entries(len(queue)), before):
+        errors.append("entries changed")
+    return report("read_only", errors)
+
+
+def case_clear(rng, data_rate, time_window):
+    """
+    A cleared queue is empty and fills again like a new one; append_xyz adds
+    the magnitude
+    """
+    queue = DataQueue(data_rate, time_window, rng.normal(size=70))
+    queue.clear()
+    reference = deque(maxlen=queue._size)
+    errors = compare(queue, reference, rng)
+    errors += append_all(queue, reference, rng.normal(size=queue._size), rng)
+    queue.append_xyz(3.0, 4.0, 12.0)
+    reference.append(13.0)
+    errors += compare(queue, reference, rng)
+    return report("clear", errors)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check DataQueue against a \
+        deque reference")
+    parser.add_argument("-r", "--data_rate", type=int, default=100,
+        help="Queue data rate in Hz")
+    parser.add_argument("-t", "--time_window", type=float, default=0.37,
+        help="Queue time window in seconds")
+    parser.add_argument("-s", "--seed", type=int, default=0,
+        help="Random seed")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    cases = (case_wraparound, case_initial_data, case_time_limit,
+             case_read_only, case_clear)
+    passed = True
+    for case in cases:
+        passed &= case(rng, args.data_rate, args.time_window)
+
+    print("PASSED" if passed else "FAILED")
+    sys.exit(0 if passed else 1)
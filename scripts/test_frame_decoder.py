@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+
+# Check the binary IMU frame decoder: CRC, round trip, resync after noise and
+# corruption, and the dropped sample count. The last case runs the frames 
+# end to end from the fake device over a pseudo-terminal into ImuInterface
+
+# Python import
+import argparse
+import contextlib
+import io
+import os
+import pty
+import sys
+import threading
+import time
+import tty
+
+# Add Project root for imports
+FILE_PATH = sys.path[0]
+ROOT_PATH = os.path.join(FILE_PATH, '..')
+sys.path.append(ROOT_PATH)
+
+# Project Import
+from fake_imu_device import ACCEL_CONV, encode_samples, write_samples
+from src import FrameDecoder, ImuInterface
+from utils import parse_log_file
+
+# 3rd-party import
+import numpy as np
+
+SIZE = FrameDecoder.FRAME_SIZE
+
+
+def make_frames(rng, num_frames, first_seq=65000, payload_sync=True):
+    """
+    Make random raw readings and their frames; the sequence numbers start
+    near the uint16 limit so they wrap
+
+    Args:
+        np.random.Generator rng - random source
+        int num_frames - number of frames
+        int first_seq - sequence number of the first frame
+        bool payload_sync - put the sync word in the payload of every fifth
+            frame
+
+    Rtn:
+        tuple of (seq, accel_raw, gyro_raw, list of bytes, one per frame)
+    """
+    seq = (first_seq + np.arange(num_frames)) % 65536
+    accel_raw = rng.integers(-32768, 32768, (num_frames, 3), dtype=np.int16)
+    gyro_raw = rng.integers(-32768, 32768, (num_frames, 3), dtype=np.int16)
+    if payload_sync:
+        # The sync word as a payload value must not split frames
+        accel_raw[::5, 0] = 0x5AA5
+    data = FrameDecoder.encode(seq, accel_raw, gyro_raw)
+    frames = [data[i*SIZE:(i + 1)*SIZE] for i in range(num_frames)]
+    return seq, accel_raw, gyro_raw, frames
+
+
+def decode_chunks(decoder, data, rng, max_chunk=40):
+    """
+    Feed data to a decoder in random sized chunks, like reads from a port
+
+    Rtn:
+        tuple of np.arrays (seq, accel, gyro) of every decoded frame
+    """
+    outputs = []
+    idx = 0
+    while idx < len(data):
+        step = int(rng.integers(1, max_chunk + 1))
+        outputs.append(decoder.decode(data[idx:idx + step]))
+        idx += step
+    return tuple(np.concatenate(out) for out in zip(*outputs))
+
+
+def check(name, results):
+    """
+    Print each named result of a case
+
+    Args:
+        string name - name of the case
+        dict results - description to (got, expected) pairs
+
+    Rtn:
+        bool True if every result matches
+    """
+    passed = all(np.array_equal(got, expected)
+                 for got, expected in results.values())
+    print(f"{name:<12}{'ok' if passed else 'FAILED'}")
+    for desc, (got, expected) in results.items():
+        if not np.array_equal(got, expected):
+            print(f"    {desc}: got {got}, expected {expected}")
+    return passed
+
+
+def case_crc():
+    """
+    CRC-16/CCITT-FALSE of '123456789' is 0x29B1
+    """
+    check_bytes = np.frombuffer(b'123456789', dtype=np.uint8)[None, :]
+    return check("crc", {"check value":
+        (int(FrameDecoder.crc16(check_bytes)[0]), 0x29B1)})
+
+
+def case_round_trip(rng, num_frames):
+    """
+    Every frame comes back unchanged and nothing is counted as lost
+    """
+    seq, accel_raw, gyro_raw, frames = make_frames(rng, num_frames)
+    decoder = FrameDecoder()
+    got_seq, accel, gyro = decode_chunks(decoder, b''.join(frames), rng)
+    return check("round_trip", {
+        "seq": (got_seq, seq),
+        "accel": (accel, accel_raw*0.000598),
+        "gyro": (gyro, gyro_raw*0.01527),
+        "num_frames": (decoder.num_frames, num_frames),
+        "dropped": (decoder.dropped, 0),
+        "crc_errors": (decoder.crc_errors, 0),
+        "skipped_bytes": (decoder.skipped_bytes, 0)})
+
+
+def case_dropped(rng, num_frames):
+    """
+    Frames missing from the stream are counted from the sequence gaps, also
+    across the wrap
+    """
+    seq, _, _, frames = make_frames(rng, num_frames)
+    # A loss only shows once a later frame arrives, so keep the last one
+    keep = np.ones(num_frames, dtype=bool)
+    keep[rng.choice(np.arange(1, num_frames - 1), num_frames//10,
+                    replace=False)] = False
+    decoder = FrameDecoder()
+    got_seq, _, _ = decode_chunks(decoder,
+        b''.join(frame for frame, kept in zip(frames, keep) if kept), rng)
+    return check("dropped", {
+        "seq": (got_seq, seq[keep]),
+        "dropped": (decoder.dropped, num_frames - np.sum(keep)),
+        "crc_errors": (decoder.crc_errors, 0)})
+
+
+def case_corrupt(rng, num_frames):
+    """
+    Frames with a flipped payload bit fail the CRC, are skipped, and show up
+    as dropped samples. The payloads hold no planted sync words; one in a 
+    corrupted frame would start a candidate frame that a 16-bit CRC passes 
+    about once in 65536 tries
+    """
+    seq, _, _, frames = make_frames(rng, num_frames, payload_sync=False)
+    bad = np.zeros(num_frames, dtype=bool)
+    bad[rng.choice(np.arange(1, num_frames - 1), num_frames//10,
+                   replace=False)] = True
+    stream = []
+    for frame, is_bad in zip(frames, bad):
+        if is_bad:
+            frame = bytearray(frame)
+            frame[int(rng.integers(4, SIZE - 2))] ^= 1 << int(rng.integers(8))
+            frame = bytes(frame)
+        stream.append(frame)
+    stream = b''.join(stream)
+
+    # Every sync word starting in a corrupted frame is a CRC error; random 
+    # payloads can hold one besides the frame's own
+    buf = np.frombuffer(stream, dtype=np.uint8)
+    syncs = np.flatnonzero((buf[:-1] == 0xA5) & (buf[1:] == 0x5A))
+    syncs = syncs[syncs + SIZE <= len(buf)]
+    num_errors = np.sum(bad[syncs//SIZE])
+
+    decoder = FrameDecoder()
+    got_seq, _, _ = decode_chunks(decoder, stream, rng)
+    return check("corrupt", {
+        "seq": (got_seq, seq[~bad]),
+        "crc_errors": (decoder.crc_errors, num_errors),
+        "dropped": (decoder.dropped, np.sum(bad)),
+        "skipped_bytes": (decoder.skipped_bytes, np.sum(bad)*SIZE)})
+
+
+def case_resync(rng, num_frames):
+    """
+    Noise before and between frames, as when the port is opened mid stream,
+    is skipped without losing a frame
+    """
+    seq, _, _, frames = make_frames(rng, num_frames)
+    noise_bytes = 0
+    stream = [frames[0][7:]]    # Tail of a frame sent before the port opened
+    noise_bytes += SIZE - 7
+    for i, frame in enumerate(frames):
+        if i % 9 == 0:
+            # Noise without sync words, so every byte of it is skipped
+            noise = rng.integers(0, 0xA5, int(rng.integers(1, 30)),
+                                 dtype=np.uint8).tobytes()
+            stream.append(noise)
+            noise_bytes += len(noise)
+        stream.append(frame)
+    decoder = FrameDecoder()
+    got_seq, _, _ = decode_chunks(decoder, b''.join(stream), rng)
+    return check("resync", {
+        "seq": (got_seq, seq),
+        "dropped": (decoder.dropped, 0),
+        "crc_errors": (decoder.crc_errors, 0),
+        "skipped_bytes": (decoder.skipped_bytes, noise_bytes)})
+
+
+def case_pty(num_frames, data_rate=2000):
+    """
+    Frames written by the fake device to a pseudo-terminal, with every 
+    seventh frame lost, one corrupted frame, and noise, are read back through
+    ImuInterface(binary=True).read_batch
+    """
+    data_dict = parse_log_file(os.path.join(ROOT_PATH,
+        'data/cadence_test_data/MT_RKS_switch_10_12.txt'))
+    accel = np.column_stack((data_dict['AccX'], data_dict['AccY'],
+                             data_dict['AccZ']))[:num_frames]
+    samples = encode_samples(accel, binary=True, drop_every=7)
+    # A loss only shows once a later frame arrives, so end on a sent frame
+    while len(samples[-1]) == 0:
+        samples.pop()
+    accel = accel[:len(samples)]
+    seq = np.arange(len(samples))
+    sent = np.array([len(sample) > 0 for sample in samples])
+
+    # Flip a gyro bit of one frame; the gyro counts are zero so no sync 
+    # word is made
+    bad_idx = int(np.flatnonzero(sent)[len(seq)//2])
+    frame = bytearray(samples[bad_idx])
+    frame[12] ^= 0x10
+    samples[bad_idx] = bytes(frame)
+    buf = np.frombuffer(samples[bad_idx], dtype=np.uint8)
+    num_errors = int(np.sum((buf[:-1] == 0xA5) & (buf[1:] == 0x5A)))
+    good = sent.copy()
+    good[bad_idx] = False
+
+    # Port opened mid frame, and noise without sync words between frames
+    noise_bytes = 5 + 9 + 11
+    samples[0] = samples[1][-5:] + bytes(range(9)) + samples[0]
+    samples[len(samples)//3] = bytes(range(40, 51)) + samples[len(samples)//3]
+
+    master, slave = pty.openpty()
+    tty.setraw(slave)
+    with contextlib.redirect_stdout(io.StringIO()):
+        imu = ImuInterface(data_rate, os.ttyname(slave), binary=True)
+    writer = threading.Thread(target=write_samples,
+                              args=(master, samples, data_rate))
+    writer.start()
+    batches = []
+    deadline = time.monotonic() + 5 + len(samples)/data_rate
+    while sum(len(batch) for batch in batches) < np.sum(good) and \
+        time.monotonic() < deadline:
+        batches.append(imu.read_batch())
+    writer.join()
+    decoder = imu.frame_decoder
+    imu.close()
+    os.close(master)
+    os.close(slave)
+
+    got = np.concatenate(batches)
+    accel_raw = np.clip(np.round(accel/ACCEL_CONV), -32768, 32767)
+    return check("pty", {
+        "num_frames": (len(got), np.sum(good)),
+        "accel": (got[:, :3], accel_raw[good]*0.000598),
+        "gyro": (got[:, 3:], np.zeros((np.sum(good), 3))),
+        "num_samples": (imu.jitter_stats['num_samples'], np.sum(good)),
+        "dropped": (decoder.dropped, len(seq) - np.sum(good)),
+        "crc_errors": (decoder.crc_errors, num_errors),
+        "skipped_bytes": (decoder.skipped_bytes, noise_bytes + SIZE)})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the binary IMU frame \
+        decoder")
+    parser.add_argument("-n", "--num_frames", type=int, default=2000,
+        help="Frames per case")
+    parser.add_argument("-s", "--seed", type=int, default=0,
+        help="Random seed")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    passed = case_crc()
+    passed &= case_round_trip(rng, args.num_frames)
+    passed &= case_dropped(rng, args.num_frames)
+    passed &= case_corrupt(rng, args.num_frames)
+    passed &= case_resync(rng, args.num_frames)
+    passed &= case_pty(min(args.num_frames, 1000))
+
+    print("PASSED" if passed else "FAILED")
+    sys.exit(0 if passed else 1)
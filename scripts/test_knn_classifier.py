@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+
+# Check the sklearn free KNN predictor against the sklearn models it replaces
+
+# Python import
+import argparse
+import glob
+import os
+import sys
+
+# Add Project root for imports
+FILE_PATH = sys.path[0]
+ROOT_PATH = os.path.join(FILE_PATH, '..')
+sys.path.append(ROOT_PATH)
+
+# Project Import
+from src import ClassifierSM, KnnClassifier
+from utils import calc_features, parse_log_file
+
+# 3rd-party import
+import numpy as np
+import pandas as pd
+
+# Order calc_features returns the features in
+FEATURES = ("DomFreq", "Intensity", "Periodicity")
+
+
+def feature_windows(logfiles, window_s=3.5, hop=3):
+    """
+    Extract the classifier features of windows slid across logfiles
+
+    Args:
+        list of strings logfiles - filepaths of MT or SIM logfiles
+        float window_s - window length in seconds
+        int hop - number of samples between windows
+
+    Rtn:
+        2-D np.array of features, one row per window, in FEATURES order
+    """
+    rows = []
+    for logfile in logfiles:
+        data_dict = parse_log_file(logfile)
+        accel = np.asarray(data_dict['AccM'], dtype=np.float64)
+        fs = data_dict['SampleRate']
+        window = int(window_s*fs)
+        if len(accel) < window:
+            continue
+        windows = np.lib.stride_tricks.sliding_window_view(accel,
+                                                           window)[::hop]
+        rows.append(np.column_stack(calc_features(windows, fs)))
+    return np.concatenate(rows)
+
+
+def compare_model(modelfile, features):
+    """
+    Compare predict_proba of a joblib KNN model against a KnnClassifier built
+    from it and, if one exists, the .npz artifact exported next to it
+
+    Args:
+        string modelfile - filepath of the joblib model
+        2-D np.array features - query windows in FEATURES order
+
+    Rtn:
+        dict of predictor name to the number of windows whose probabilities
+        differ from sklearn, or a string saying why the model was skipped
+    """
+    try:
+        modeldata = ClassifierSM.read_modelfile(modelfile)
+    except ImportError as err:
+        # Pickled by an sklearn version whose modules no longer exist
+        return f"could not be loaded ({err})"
+    model = modeldata['modeldata']['model']
+    if not hasattr(model, 'effective_metric_'):
+        return "not a KNN"
+
+    # Order the features the way the model was fitted
+    fitted_names = getattr(model, 'feature_names_in_', None)
+    feature_names = modeldata.get('metadata', {}).get('feature_names',
+                                                      fitted_names)
+    if feature_names is None:
+        feature_names = FEATURES
+    X = features[:, [FEATURES.index(name) for name in feature_names]]
+    query = X if fitted_names is None else \
+        pd.DataFrame(X, columns=list(fitted_names))
+    expected = model.predict_proba(query)
+
+    predictors = {'from_sklearn': KnnClassifier.from_sklearn(model)}
+    artifact = os.path.splitext(modelfile)[0] + '.npz'
+    if os.path.exists(artifact):
+        predictors['npz'] = KnnClassifier.load(artifact)[0]
+
+    mismatches = {}
+    for name, predictor in predictors.items():
+        probs = predictor.predict_proba(X)
+        mismatches[name] = int(np.sum(np.any(probs != expected, axis=1)))
+    return mismatches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare KnnClassifier \
+        probabilities against the sklearn models")
+    parser.add_argument("-m", "--models", type=str,
+        default=os.path.join(ROOT_PATH, 'models/*.joblib'),
+        help="Joblib model or glob pattern of models")
+    parser.add_argument("-f", "--logfiles", type=str,
+        default=os.path.join(ROOT_PATH, 'data/*/*.txt'),
+        help="Logfile or glob pattern of logfiles to take windows from")
+    parser.add_argument("--hop", type=int, default=3,
+        help="Samples between windows")
+    args = parser.parse_args()
+
+    logfiles = [logfile for logfile in sorted(glob.glob(args.logfiles))
+                if os.path.basename(logfile).startswith(('MT', 'SIM'))]
+    features = feature_windows(logfiles, hop=args.hop)
+    print(f"{len(features)} windows from {len(logfiles)} logs")
+
+    passed = True
+    for modelfile in sorted(glob.glob(args.models)):
+        mismatches = compare_model(modelfile, features)
+        if isinstance(mismatches, str):
+            print(f"{os.path.basename(modelfile)}: {mismatches}, skipped")
+            continue
+        print(f"{os.path.basename(modelfile)}: " + ", ".join(
+            f"{name} {num} mismatched" for name, num in mismatches.items()))
+        passed &= sum(mismatches.values()) == 0
+
+    print("PASSED" if passed else "FAILED")
+    sys.exit(0 if passed else 1)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+# Check that the batch offline SIL engine logs exactly what sil_main logs
+
+# Python import
+import argparse
+import contextlib
+import glob
+import io
+import os
+import sys
+
+# Add Project root for imports
+FILE_PATH = sys.path[0]
+ROOT_PATH = os.path.join(FILE_PATH, '..')
+sys.path.append(ROOT_PATH)
+
+# Project Import
+import run_sil
+
+# 3rd-party import
+import numpy as np
+
+# Run params checked, on top of the defaults
+CONFIGS = {'default': {},
+           'indirect': {'ct_method': 'indirect'},
+           'hops': {'csm_hop': {'hop_samples': 10},
+                    'ct_hop': {'hop_s': 0.25}},
+           'causal_online': {'ct_filtering': 'causal',
+                             'ct_peak_detection': 'online'},
+           'double_pend': {'double_pend': True}}
+
+
+def compare_logs(logfile, params):
+    """
+    Replay a logfile with sil_main and offline_sil_main
+
+    Args:
+        string logfile - filepath of the logfile
+        dict params - run params, see run_sil.object_setup
+
+    Rtn:
+        list of the logger_dict keys whose entries differ
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        online = run_sil.sil_main(logfile, '', params)
+        offline = run_sil.offline_sil_main(logfile, '', params)
+
+    mismatches = []
+    for key in online:
+        if key == 'logname':
+            continue
+        if key not in offline or len(online[key]) != len(offline[key]) or \
+            not np.array_equal(np.asarray(online[key]),
+                               np.asarray(offline[key])):
+            mismatches.append(key)
+    return mismatches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the logger_dict of \
+        offline_sil_main against sil_main")
+    parser.add_argument("-f", "--logfiles", type=str,
+        default=os.path.join(ROOT_PATH, 'data/cadence_test_data/*.txt'),
+        help="Logfile or glob pattern of logfiles to replay")
+    parser.add_argument("-m", "--modelfile", type=str,
+        default=os.path.join(ROOT_PATH, 'models/RKS_FINAL_BIN.npz'),
+        help="Classifier modelfile")
+    args = parser.parse_args()
+
+    # object_setup reads the trajectory templates relative to the root
+    os.chdir(ROOT_PATH)
+    logfiles = sorted(glob.glob(args.logfiles))
+
+    passed = len(logfiles) > 0
+    for name, config in CONFIGS.items():
+        params = {'modelfile': args.modelfile}
+        params.update(config)
+        for logfile in logfiles:
+            mismatches = compare_logs(logfile, params)
+            result = 'differs: ' + ', '.join(mismatches) if mismatches \
+                else 'ok'
+            print(f"{name:<14}{os.path.basename(logfile):<28}{result}",
+                  flush=True)
+            passed &= len(mismatches) == 0
+
+    print("PASSED" if passed else "FAILED")
+    sys.exit(0 if passed else 1)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+# Check the sliding spectral estimator against scipy's welch
+
+# Python import
+import argparse
+import os
+import sys
+
+# Add Project root for imports
+FILE_PATH = sys.path[0]
+ROOT_PATH = os.path.join(FILE_PATH, '..')
+sys.path.append(ROOT_PATH)
+
+# Project Import
+from src import SlidingWelch
+from utils import parse_mt_file
+
+# 3rd-party import
+import numpy as np
+from scipy import signal, stats
+
+
+def compare_features(accel_data, fs, window, hop):
+    """
+    Slide a window across the data and compare the classifier features of
+    SlidingWelch and scipy's welch
+
+    Args:
+        np.array accel_data - acceleration magnitudes
+        num fs - sample rate of the data
+        int window - window length in samples
+        int hop - number of new samples between updates
+
+    Rtn:
+        tuple of the max relative psd error, max relative intensity error,
+            max absolute periodicity error and number of mismatched DomFreq
+    """
+    engine = SlidingWelch(fs)
+    psd_err = 0.0
+    intensity_err = 0.0
+    periodicity_err = 0.0
+    freq_mismatch = 0
+    for end_idx in range(window, len(accel_data), hop):
+        datum = accel_data[end_idx - window:end_idx]
+        _, Pxx_slide = engine.update(datum, hop)
+        f, Pxx = signal.welch(datum, fs, nperseg=window)
+        dom_freq, intensity, periodicity = engine.get_features()
+
+        max_idx = np.argmax(Pxx)
+        psd_err = max(psd_err, np.max(np.abs(Pxx_slide - Pxx))/Pxx[max_idx])
+        intensity_err = max(intensity_err,
+                            abs(intensity - Pxx[max_idx])/Pxx[max_idx])
+        periodicity_err = max(periodicity_err,
+                              abs(periodicity - stats.entropy(Pxx/sum(Pxx))))
+        if dom_freq != f[max_idx]:
+            freq_mismatch += 1
+
+    return psd_err, intensity_err, periodicity_err, freq_mismatch
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare sliding welch \
+        features against scipy's welch")
+    parser.add_argument("-f", "--logfile", type=str,
+        default=os.path.join(ROOT_PATH,
+                             'data/cadence_test_data/MT_RKS_switch_10_12.txt'),
+        help="MT logfile to slide across")
+    parser.add_argument("-w", "--window", type=int, default=350,
+        help="Window length in samples")
+    parser.add_argument("-t", "--tolerance", type=float, default=1e-9,
+        help="Maximum accepted relative error")
+    args = parser.parse_args()
+
+    data_dict = parse_mt_file(args.logfile)
+    accel_data = data_dict["AccM"]
+    fs = data_dict["SampleRate"]
+
+    passed = True
+    for hop in (1, 5, 25):
+        errs = compare_features(accel_data, fs, args.window, hop)
+        print(f"hop {hop:02}: psd err {errs[0]:.3e}, intensity err "
+              f"{errs[1]:.3e}, periodicity err {errs[2]:.3e}, "
+              f"DomFreq mismatches {errs[3]}")
+        passed &= max(errs[:3]) < args.tolerance and errs[3] == 0
+
+    print("PASSED" if passed else "FAILED")
+    sys.exit(0 if passed else 1)
@@ -15,6 +15,7 @@ ROOT_PATH = os.path.join(FILE_PATH, '..')
 sys.path.append(ROOT_PATH)
 
 # Project Import
+from src import KnnClassifier
 from utils import build_training_set, get_prec_and_recall, x_version
 # plot_features
 
@@ -68,6 +69,7 @@ def train_knn_model(data_directory,
     knn_metrics = {"accuracy":knn_accuracy}
 
     knn_metadata = {"features":features, 
+                    "feature_names":list(train_data.columns),
                     "date":str(datetime.datetime.today()),
                     "version": x_version()}
 
@@ -135,6 +137,7 @@ def explore_knn_model(data_directory,
     knn_metrics = {"accuracy":knn_accuracy}
 
     knn_metadata = {"features":features, 
+                    "feature_names":list(train_data.columns),
                     "date":str(datetime.datetime.today()),
                     "version": x_version()}
 
@@ -198,9 +201,35 @@ def save_knn_model(knn_meta, filename=None):
     joblib.dump(knn_meta, save_dir)
 
 
+def export_knn_model(knn_meta, filename=None):
+    """
+    Write a compact inference artifact of the model: the training points as 
+    a float32 array, labels as small ints, k and the weighting. ClassifierSM
+    loads it without sklearn or the training features DataFrame
+    """
+    if filename is None:
+        filename = f"KNN_{str(datetime.datetime.today()).replace(' ','_')}.npz"
+    else:
+        filename += ".npz"
+    knn_model = knn_meta["modeldata"]["model"]
+    metadata = knn_meta["metadata"]
+    feature_names = metadata.get("feature_names", 
+                                 getattr(knn_model, "feature_names_in_", None))
+    if feature_names is None:
+        raise ValueError("ERROR: Model does not record its feature names")
+    info = {"classifier": "src.KnnClassifier",
+            "metrics": {key: float(val) 
+                        for key, val in knn_meta["metrics"].items()},
+            "metadata": {"feature_names": [str(name) for name in feature_names],
+                         "date": metadata["date"],
+                         "version": metadata["version"]}}
+    save_dir = os.path.join(ROOT_PATH, f"models/{filename}")
+    KnnClassifier.from_sklearn(knn_model).save(save_dir, info)
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="")
-    parser.add_argument("data_dir", type=str, help="")
+    parser.add_argument("data_dir", type=str, nargs='?', help="")
     parser.add_argument('-k', type=int, default=3, help="")
     parser.add_argument('-e','--explore', type=int, help="")
     parser.add_argument('-b', '--binary', action='store_true', help="")
@@ -208,9 +237,21 @@ if __name__ == "__main__":
     parser.add_argument("-r", "--plot_result", action='store_true', help="")
     parser.add_argument("-s", "--save_model", action='store_true', help="")
     parser.add_argument("-n", "--model_name", type=str, help="")
+    parser.add_argument("-c", "--compact", action='store_true', 
+        help="Also save a compact .npz inference artifact of the model")
+    parser.add_argument("-x", "--export", type=str, 
+        help="Export an existing joblib model as a compact .npz artifact \
+            named after it, then exit")
 
     args = parser.parse_args()
 
+    if args.export:
+        # Convert existing model
+        name = os.path.splitext(os.path.basename(args.export))[0]
+        export_knn_model(joblib.load(args.export), name)
+        sys.exit(0)
+    elif args.data_dir is None:
+        parser.error("data_dir is required unless exporting a model")
     
     if args.explore:
         # Explore KNNs
@@ -229,4 +270,6 @@ if __name__ == "__main__":
     # Save model
     if (args.save_model):
         save_knn_model(knn_data, args.model_name)
+        if (args.compact):
+            export_knn_model(knn_data, args.model_name)
     
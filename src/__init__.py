@@ -3,11 +3,40 @@
 Create the src python package
 """
 
+# Python imports
+import importlib
+
 # Project imports
 from src.cadence_tracker import CadenceTracker
 from src.classifier_sm import ClassifierSM
 from src.data_queue import DataQueue
-from src.imu_interface import ImuInterface
-from src.pendulum_gui import PendulumGUI
+from src.frame_decoder import FrameDecoder
+from src.knn_classifier import KnnClassifier
+from src.latency_profiler import LatencyProfiler
+from src.serial_reader import SerialReader
+from src.sliding_welch import SlidingWelch
+from src.stage_scheduler import StageScheduler
 from src.traj_look_up import TrajectoryLookUp
-from src.traj_spline_gen import TrajectorySplineGenerator
\ No newline at end of file
+from src.traj_spline_gen import TrajectorySplineGenerator
+
+# Classes imported on first access; they pull in pygame and pyserial, which 
+# headless replays never need
+_LAZY_IMPORTS = {"ImuInterface": "src.imu_interface",
+                 "PendulumGUI": "src.pendulum_gui"}
+
+
+def __getattr__(name):
+    """
+    Import a lazily loaded class on first access
+    """
+    if name in _LAZY_IMPORTS:
+        module = importlib.import_module(_LAZY_IMPORTS[name])
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    """
+    Return the package attributes including the lazily loaded classes
+    """
+    return sorted(list(globals()) + list(_LAZY_IMPORTS))
@@ -4,6 +4,9 @@ File for Cadence Tracker Class
 """
 
 # Project Import
+from src.data_queue import DataQueue
+from src.peak_detector import PeakDetector
+from src.sliding_welch import SlidingWelch
 
 # Python Import
 from collections import deque
@@ -17,7 +20,8 @@ class CadenceTracker():
     Calculates the desired cadence of the arm based on the acceleration 
     magnitude readings from the IMU 
     """
-    def __init__(self, data_rate_Hz=100, time_window_s=2, method='direct'):
+    def __init__(self, data_rate_Hz=100, time_window_s=2, method='direct',
+        filtering='zero_phase', peak_detection='window'):
         """
         CadenceTracker Constructer
 
@@ -29,6 +33,18 @@ class CadenceTracker():
                 'direct' - uses internal step counter for cadence
                 'indirect' - uses step estimator for cadence
                 if an unsupported string is provide, 'direct' is used
+            string filtering - how the data is low-pass filtered
+                'zero_phase' - filters the whole window forward and backward
+                    on every update
+                'causal' - filters only the new samples, keeping the filter
+                    state between updates and the filtered window in a ring
+                    buffer. The 'indirect' spectrum is also slid by the new
+                    samples instead of recomputed over the window
+            string peak_detection - how steps(peaks) are found
+                'window' - searches the whole filtered window every update
+                'online' - consumes one filtered sample at a time and tracks
+                    steps by absolute sample index. Requires 'causal' 
+                    filtering
         """
         # Set public members
         self.walking = False # True if acceleration data represents walking
@@ -50,11 +66,36 @@ class CadenceTracker():
         else:
             self._METHOD = method
 
+        ### Filtering of the data
+        if not (filtering == 'zero_phase' or filtering == 'causal'):
+            raise ValueError("ERROR: Unsupported filtering provided; "
+            "please use 'zero_phase' or 'causal'")
+        else:
+            self._FILTERING = filtering
+
+        ### Peak detection of the filtered data
+        if not (peak_detection == 'window' or peak_detection == 'online'):
+            raise ValueError("ERROR: Unsupported peak detection provided; "
+            "please use 'window' or 'online'")
+        elif peak_detection == 'online' and filtering != 'causal':
+            raise ValueError("ERROR: 'online' peak detection requires "
+            "'causal' filtering")
+        else:
+            self._PEAK_DETECTION = peak_detection
+        self._PEAK_DISTANCE = 40 # min number of samples between steps
+
         ### Set up internal filter: We use a 3rd-order butterworth with cutoff
         ### freq at 2 Hz 
         self._FILTER_B, self._FILTER_A = signal.butter(3, 2, 
                                                       'lowpass', 
                                                       fs=self._DATA_RATE_HZ)
+        self._FILTER_SOS = signal.butter(3, 2, 'lowpass', 
+                                         fs=self._DATA_RATE_HZ, output='sos')
+        ### The causal filter delays peaks; use its group delay(in samples) 
+        ### at a typical step frequency of 1.8 Hz to compensate
+        _, delay = signal.group_delay((self._FILTER_B, self._FILTER_A), 
+                                      w=[1.8], fs=self._DATA_RATE_HZ)
+        self._FILTER_DELAY = delay[0]
 
         ## Non-Constants
         self._steps_per_window = -1 # steps taken during the time window
@@ -66,6 +107,22 @@ class CadenceTracker():
         self._latest_valley = 0     # Idx for latest valley in accel data
         # history queue of time length between steps
         self._stride_history = deque(maxlen=7) 
+
+        # Variables for causal filtering
+        self._filter_zi = None      # State of the causal filter
+        self._filtered_queue = None # Filtered window of data
+        self._filter_window = 0     # Number of samples in filtered window
+        if self._FILTERING == 'causal':
+            self._psd_engine = SlidingWelch(self._DATA_RATE_HZ)
+        else:
+            self._psd_engine = None
+        self._psd_new = 0           # Samples not yet in the spectrum
+
+        # Variables for online peak detection
+        self._sample_idx = -1       # Absolute idx of latest filtered sample
+        self._peak_detector = PeakDetector(self._PEAK_DISTANCE)
+        self._valley_detector = PeakDetector(self._PEAK_DISTANCE)
+        self._recent_peaks = deque() # Absolute idxs of peaks in the window
         
 
     ## Properties of Cadence Tracker
@@ -84,6 +141,22 @@ class CadenceTracker():
         """
         return self._METHOD
 
+    @property
+    def FILTERING(self):
+        """
+        Returns whether data is filtered forward and backward over the window
+        ('zero_phase') or sample by sample ('causal')
+        """
+        return self._FILTERING
+
+    @property
+    def PEAK_DETECTION(self):
+        """
+        Returns whether peaks are searched over the whole window('window') or
+        detected sample by sample('online')
+        """
+        return self._PEAK_DETECTION
+
     @property
     def steps_per_window(self):
         """
@@ -119,20 +192,71 @@ class CadenceTracker():
         return self._step_count
 
     ## Private fcns
-    def _calc_steps_per_window(self, data):
+    def _calc_steps_per_window(self, data, num_new=1):
         """
         Calculates the number of steps taken during the time window as well
         as update the step count and estimate how long until the next step
 
+        Args:
+            list-like data - acceleration magnitude time-series
+            int num_new - number of samples the window shifted since the last
+                call
+
         Rtn:
         float step_per_window: fractional number of steps detected in data
         """
+        if self._PEAK_DETECTION == 'online':
+            # First time operations
+            if self._step_count == -1:
+                self._start_online_count()
+            time_to_end = (self._sample_idx + 1 - self._latest_peak) * \
+                self._TIME_STEP
+        else:
+            self._count_window_steps(data, num_new)
+            time_to_end = self._TIME_WINDOW_S - \
+                self._latest_peak*self._TIME_STEP
+        if self._FILTERING == 'causal':
+            time_to_end += self._FILTER_DELAY*self._TIME_STEP
+
+        # Direct counting method
+        if self._METHOD == "direct" and len(self._stride_history) > 0:
+            # Get steps per window
+            s_weights = np.linspace(len(self._stride_history), 1, 
+                len(self._stride_history))
+            avg_time_btw_step = np.average(self._stride_history, weights=s_weights)
+        
+        # Indirect extrapolate method, also used until a stride is measured
+        else:
+            avg_time_btw_step = self._estimate_steps(data)
+
+        # Time till next step
+        self._time_till_step = avg_time_btw_step - time_to_end
+
+        # steps_per_window calc
+        self._steps_per_window = (self._TIME_WINDOW_S/avg_time_btw_step)
+
+
+    def _count_window_steps(self, data, num_new=1):
+        """
+        Searches the whole filtered window for steps(peaks) and updates the 
+        step count, stride history, and the window idxs of the latest peak 
+        and valley
+
+        Args:
+            list-like data - acceleration magnitude time-series
+            int num_new - number of samples the window shifted since the last
+                call
+        """
         # Filter data for steps(peaks) and mid-gait point(valleys)
-        filtered_data = signal.filtfilt(self._FILTER_B, self._FILTER_A, data)
+        if self._FILTERING == 'causal':
+            filtered_data = self._filtered_queue.get_entries(len(data))
+        else:
+            filtered_data = signal.filtfilt(self._FILTER_B, self._FILTER_A, 
+                                            data)
         peaks, _ = signal.find_peaks(filtered_data,
-                                     distance=40)
+                                     distance=self._PEAK_DISTANCE)
         valleys, _ = signal.find_peaks(-filtered_data,
-                                        distance=40)
+                                        distance=self._PEAK_DISTANCE)
 
         # First time operations
         if self._step_count == -1:
@@ -145,7 +269,7 @@ class CadenceTracker():
 
         # Next Time
         else:
-            if peaks[-1] != self._latest_peak - 1:
+            if peaks[-1] != self._latest_peak - num_new:
                 # New step found
                 if self._latest_peak < self._latest_valley and \
                     peaks[-1] > self._latest_valley:
@@ -161,40 +285,124 @@ class CadenceTracker():
                     self._stride_history.appendleft(stride)
                     self._latest_peak = peaks[-1]
                 else:
-                    self._latest_peak -= 1
+                    self._latest_peak -= num_new
         
         # Update Valley Checkpoint    
         self._latest_valley = valleys[-1]
 
-        # Direct counting method
-        if self._METHOD == "direct":
-            # Get steps per window
-            s_weights = np.linspace(len(self._stride_history), 1, 
-                len(self._stride_history))
-            avg_time_btw_step = np.average(self._stride_history, weights=s_weights)
-        
-        # Indirect extrapolate method
+
+    def _detect_extrema(self, value, count=True):
+        """
+        Feed one filtered sample to the online peak and valley detectors and
+        update the step count when a step is found
+
+        Args:
+            float value - newest filtered sample
+            bool count - set False to only track peak and valley idxs
+        """
+        self._sample_idx += 1
+        valley = self._valley_detector.update(-value)
+        peak = self._peak_detector.update(value)
+        if valley is not None:
+            self._latest_valley = valley[0]
+        if peak is None:
+            return
+        peak_idx, replaced = peak
+
+        # Keep the peaks inside the window for the first count
+        if replaced and len(self._recent_peaks) > 0:
+            self._recent_peaks[-1] = peak_idx
         else:
-            avg_time_btw_step = self._estimate_steps(data)
+            self._recent_peaks.append(peak_idx)
+        window_start = self._sample_idx - self._filter_window
+        while self._recent_peaks[0] <= window_start:
+            self._recent_peaks.popleft()
 
-        # Time to end cals
-        time_to_end = self._TIME_WINDOW_S - self._latest_peak*self._TIME_STEP
-        self._time_till_step = avg_time_btw_step - time_to_end
+        if count and self.walking and self._step_count != -1:
+            # New step found; a valley came after the latest peak
+            if self._latest_peak < self._latest_valley:
+                stride = (peak_idx - self._latest_peak)*self._TIME_STEP
+                self._stride_history.appendleft(stride)
+                self._step_count += 1
+            # Phantom step found, the latest step moved to this peak
+            elif len(self._stride_history) > 0:
+                self._stride_history[0] += \
+                    (peak_idx - self._latest_peak)*self._TIME_STEP
+        self._latest_peak = peak_idx
 
-        # steps_per_window calc
-        self._steps_per_window = (self._TIME_WINDOW_S/avg_time_btw_step)
+
+    def _start_online_count(self):
+        """
+        Start the step count from the peaks found inside the current window
+        """
+        peaks = self._recent_peaks
+        self._step_count = len(peaks)
+        if len(peaks) > 0:
+            self._latest_peak = peaks[-1]
+        else:
+            self._latest_peak = self._sample_idx - self._filter_window
+
+        for i in range(1, len(peaks)):
+            stride = (peaks[i] - peaks[i-1])*self._TIME_STEP
+            self._stride_history.appendleft(stride)
+
+
+    def _filter_new(self, data, num_new):
+        """
+        Pass the new samples through the causal filter and append them to the
+        filtered window. The filter is (re)started over the whole window when
+        the window size changes or every sample is new
+
+        Args:
+            list-like data - acceleration magnitude time-series
+            int num_new - number of new samples at the end of data
+        """
+        num = len(data)
+        if self._filter_zi is None or num_new >= num or \
+            self._filter_window != num:
+            zi = signal.sosfilt_zi(self._FILTER_SOS)*data[0]
+            filtered_data, self._filter_zi = signal.sosfilt(self._FILTER_SOS,
+                                                            data, zi=zi)
+            self._filtered_queue = DataQueue(self._DATA_RATE_HZ, 
+                                             num/self._DATA_RATE_HZ, 
+                                             filtered_data)
+            self._filter_window = num
+
+            if self._PEAK_DETECTION == 'online':
+                # Refeed the window; samples seen before are not counted again
+                last_seen_idx = self._sample_idx
+                self._sample_idx += num_new - num
+                self._peak_detector.reset(self._sample_idx + 1)
+                self._valley_detector.reset(self._sample_idx + 1)
+                self._recent_peaks.clear()
+                for val in filtered_data:
+                    self._detect_extrema(val, 
+                                         self._sample_idx >= last_seen_idx)
+        else:
+            filtered_data, self._filter_zi = \
+                signal.sosfilt(self._FILTER_SOS, data[num - num_new:], 
+                               zi=self._filter_zi)
+            for val in filtered_data:
+                self._filtered_queue.append(val)
+                if self._PEAK_DETECTION == 'online':
+                    self._detect_extrema(val)
 
 
     def _estimate_steps(self, data):
         """
         Determines the average time between steps by extrapolating from the
-        dominant frequency
+        dominant frequency. With causal filtering the spectrum is slid by the
+        samples that arrived since it was last updated
 
         Rtn:
         float average time between steps: 1/dominant_frequency
         """
-        nPts = len(data)
-        f, Pxx = signal.welch(data, self._DATA_RATE_HZ, nperseg=nPts)
+        if self._psd_engine is not None:
+            f, Pxx = self._psd_engine.update(data, self._psd_new)
+            self._psd_new = 0
+        else:
+            nPts = len(data)
+            f, Pxx = signal.welch(data, self._DATA_RATE_HZ, nperseg=nPts)
         max_idx = np.argmax(Pxx)
         max_freq = f[max_idx]
         if max_freq < .005:
@@ -202,19 +410,29 @@ class CadenceTracker():
         return (1/max_freq)
 
     ## Public fcns
-    def update_cadence(self, data):
+    def update_cadence(self, data, num_new=1):
         """
         Given walking data, update the step count, predict the number of 
         seconds till the next step, count/estimate the number of steps taken
         during the time window. 
 
         If the data is not walking, do not increment the step count and set 
-        steps per window and time till next step to -1
+        steps per window and time till next step to -1. With causal filtering
+        the new samples are filtered either way to keep the filter state
+
+        Args:
+            list-like data - acceleration magnitude time-series
+            int num_new - number of samples the window shifted since the last
+                update; default 1
         """
+        if self._FILTERING == 'causal':
+            self._filter_new(data, num_new)
+            self._psd_new += num_new
+
         if not self.walking:
             # If we are not walking, set values to negative one
             self._steps_per_window = -1
             self._time_till_step = -1
         else:
             ## UPDATE STEP COUNT
-            self._calc_steps_per_window(data)
\ No newline at end of file
+            self._calc_steps_per_window(data, num_new)
\ No newline at end of file
@@ -8,11 +8,37 @@ import joblib
 import warnings
 
 # Project imports
+from src.knn_classifier import KnnClassifier
+from src.sliding_welch import SlidingWelch
+from utils.feature_fcns import calc_features, psd_features
 
 # 3rd-party imports
 import numpy as np
-import pandas as pd
-from scipy import signal, stats
+
+
+class _BareRowModel:
+    """
+    Wraps a model fitted on named features so it can be fed bare rows. The
+    caller orders the columns as the model was fitted; the wrapped model is 
+    left unchanged
+    """
+    def __init__(self, model):
+        """
+        Args:
+            fitted sklearn classifier model - model with feature_names_in_
+        """
+        self.model = model
+        self.classes_ = model.classes_
+
+    def predict_proba(self, X):
+        """
+        Return the model's predict_proba of X, without the warning that X 
+        has no feature names
+        """
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore", 
+                message="X does not have valid feature names")
+            return self.model.predict_proba(X)
 
 
 class ClassifierSM:
@@ -20,20 +46,26 @@ class ClassifierSM:
     Classifier state machine that identifies which activity acceleration data
     represents
     """
-    def __init__(self, modelfile, threshold=.8, time_window=1.0):
+    def __init__(self, modelfile, threshold=.8, time_window=1.0, 
+        streaming=False):
         """
         Constructor of Classifier State Machine
 
         Args:
-            string modelfile - a joblib binary that contains the classifier 
-                information. The infomation should contain the modeldata with 
-                the model and type of classifier, a dictionary of metrics 
-                (e.g. accuracy) of the model, and metadata contain the training
-                features, date generated, and version of this software used to 
-                generate it. 
+            string or dict modelfile - a joblib binary that contains the 
+                classifier information, or its loaded contents. The 
+                infomation should contain the modeldata with the model and 
+                type of classifier, a dictionary of metrics (e.g. accuracy) of
+                the model, and metadata contain the training features, date 
+                generated, and version of this software used to generate it. 
+                A compact .npz artifact from scripts/train_knn.py is also 
+                accepted. 
             float threshold - the minimum confidence the classifier must have 
                 for predicting a state
             float time_window - length of input data in number of seconds
+            bool streaming - set True to extract features with a sliding 
+                spectral estimator updated by the new samples of each window 
+                instead of recomputing welch over the whole window
         """
         # Set public members
         self.time_window = time_window
@@ -42,7 +74,10 @@ class ClassifierSM:
         self.threshold = threshold
 
         # Set private members
-        ## Load model file TODO Model Validation
+        ## Features in the order calc_features returns them
+        self._FEATURES = ("DomFreq", "Intensity", "Periodicity")
+
+        ## Load model file
         self.load_model(modelfile)
 
         ## Set Constants
@@ -51,6 +86,13 @@ class ClassifierSM:
         # state when classification confidence is below threshold
         self._UNKNOWN_STATE = "unknown" 
         self._STATE = self._UNKNOWN_STATE
+        self._BATCH_SIZE = 2048 # max number of windows per batched welch
+
+        ## Set up feature extraction
+        if streaming:
+            self._psd_engine = SlidingWelch()
+        else:
+            self._psd_engine = None
 
 
     # ClassifierSM properties
@@ -119,15 +161,65 @@ class ClassifierSM:
         Load a modelfile into the state machine
 
         Args:
-            string modelfile - a joblib binary that contains the classifier 
-                information.
+            string or dict modelfile - a joblib binary that contains the 
+                classifier information, or the already loaded contents of one
         """
-        self._modeldata = joblib.load(modelfile)
+        if isinstance(modelfile, dict):
+            self._modeldata = modelfile
+        else:
+            self._modeldata = self.read_modelfile(modelfile)
         self._model = self._modeldata['modeldata']['model']
         self._lables = self._model.classes_
 
+        # Validate the feature order the model was trained with
+        fitted_names = getattr(self._model, 'feature_names_in_', None)
+        feature_names = self._modeldata.get('metadata', {}).get(
+            'feature_names', fitted_names)
+        if feature_names is None:
+            feature_names = self._FEATURES
+        if fitted_names is not None and \
+            list(fitted_names) != list(feature_names):
+            raise ValueError(f"ERROR: Model was fitted with features "
+                             f"{list(fitted_names)} but its metadata lists "
+                             f"{list(feature_names)}")
+        if sorted(feature_names) != sorted(self._FEATURES):
+            raise ValueError(f"ERROR: Model features {list(feature_names)} "
+                             f"do not match the extracted features "
+                             f"{list(self._FEATURES)}")
+        self._feature_order = [self._FEATURES.index(name) 
+                               for name in feature_names]
 
-    def predict(self, data, sample_rate=100):
+        # Features are fed as a bare row in the order checked above; a model
+        # fitted on named features is wrapped so sklearn does not check the 
+        # names on every call
+        if fitted_names is not None:
+            self._model = _BareRowModel(self._model)
+        self._feat_row = np.zeros((1, len(self._FEATURES)))
+
+
+    @staticmethod
+    def read_modelfile(modelfile):
+        """
+        Read the contents of a modelfile. A compact .npz artifact exported by
+        scripts/train_knn.py is loaded as a KnnClassifier without sklearn; 
+        any other file is loaded with joblib
+
+        Args:
+            string modelfile - filepath to the modelfile
+
+        Rtn:
+            dict with the modeldata, metrics and metadata of the model
+        """
+        if str(modelfile).endswith('.npz'):
+            model, info = KnnClassifier.load(modelfile)
+            return {'modeldata': {'model': model, 
+                                  'classifier': info.get('classifier')},
+                    'metrics': info.get('metrics', {}),
+                    'metadata': info.get('metadata', {})}
+        return joblib.load(modelfile)
+
+
+    def predict(self, data, sample_rate=100, num_new=1):
         """
         Predict which activity the data represents and update the state 
         accordingly
@@ -135,23 +227,25 @@ class ClassifierSM:
         Args:
             list-like data - array of acceleration magnitude time-series
             num sample_rate - sample rate of items in data
+            int num_new - number of samples at the end of data that were not
+                in the previous call; only used in streaming mode
         """
         # Extract features
-        feat_dict = {"DomFreq":[], "Intensity":[], "Periodicity":[]}
-        nPts = len(data)
-        f, Pxx = signal.welch(data, sample_rate, nperseg=nPts)
-        max_idx = np.argmax(Pxx)
-        feat_dict["DomFreq"].append(f[max_idx])
-        feat_dict["Intensity"].append(Pxx[max_idx])
-        P_sum = sum(Pxx)
-        Pxx_norm = Pxx/P_sum
-        feat_dict["Periodicity"].append(stats.entropy(Pxx_norm))
-        feat_df = pd.DataFrame(feat_dict)
+        if self._psd_engine is not None:
+            if self._psd_engine.sample_rate != sample_rate:
+                self._psd_engine.sample_rate = sample_rate
+                self._psd_engine.reset()
+            f, Pxx = self._psd_engine.update(data, num_new)
+            features = psd_features(f, Pxx)
+        else:
+            features = calc_features(data, sample_rate)
+        for col, idx in enumerate(self._feature_order):
+            self._feat_row[0, col] = features[idx]
 
         # Predict
-        probs = self._model.predict_proba(feat_df)[0]
+        probs = self._model.predict_proba(self._feat_row)[0]
         idx = np.argmax(probs)
-        if feat_dict["Intensity"][0] < self._STILL_STATE_THRES:
+        if features[1] < self._STILL_STATE_THRES:
             self._STATE = self._STILL_STATE
         elif probs[idx] > self._threshold:
             self._STATE = self._lables[idx]
@@ -159,4 +253,36 @@ class ClassifierSM:
             self._STATE = self._UNKNOWN_STATE
 
         return self._STATE
-        
+
+
+    def predict_windows(self, windows, sample_rate=100):
+        """
+        Predict which activity each window of data represents in one batch. 
+        The state is updated to the prediction of the last window
+
+        Args:
+            2-D array-like windows - acceleration magnitude time-series, one 
+                window per row
+            num sample_rate - sample rate of items in windows
+
+        Rtn:
+            np.array of states, one per window
+        """
+        # Extract features
+        if len(windows) == 0:
+            return np.array([], dtype=object)
+        features = calc_features(windows, sample_rate, self._BATCH_SIZE)
+        feat_rows = np.column_stack([features[idx] 
+                                     for idx in self._feature_order])
+
+        # Predict
+        probs = self._model.predict_proba(feat_rows)
+        idx = np.argmax(probs, axis=-1)
+        confident = probs[np.arange(len(probs)), idx] > self._threshold
+        states = np.where(confident, self._lables[idx], 
+                          self._UNKNOWN_STATE).astype(object)
+        still = features[1] < self._STILL_STATE_THRES
+        states[still] = self._STILL_STATE
+
+        self._STATE = states[-1]
+        return states
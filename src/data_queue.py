@@ -6,8 +6,6 @@ File for DataQueue Class
 # Project Import
 
 # Python Import
-from collections import deque
-import itertools
 
 # 3rd-party import
 import numpy as np
@@ -16,6 +14,11 @@ class DataQueue():
     """
     FIFO-Queue with ability to return a number of entries based 
     on time window
+
+    The queue is backed by a preallocated, mirrored float64 ring buffer. Every
+    entry is written twice (at idx and idx + size) so the latest entries are
+    always contiguous in memory and can be returned as a read-only view 
+    without copying.
     """
     def __init__(self, data_rate_Hz=100, time_window_s=3, data=None):
         """
@@ -25,7 +28,7 @@ class DataQueue():
             int data_rate_Hz - frequency of the incoming data; default 100Hz
             float time_limit_s - Duration of data (in seconds) held be queue
                 default 3 seconds
-            list data - Initial array; default None
+            list-like data - Initial array; default None
                 If data is not None, it is pressumed to be sampled at rate_Hz
                 and organized from oldest to newest entry. If data is too 
                 large, only the latest 'time_limit_s' duration will be saved
@@ -38,10 +41,9 @@ class DataQueue():
         self._time_limit = time_window_s
 
         self._size = int(np.ceil( time_window_s / (1 / self._RATE_HZ) ))
-        if data:
-            self._queue = deque(data, maxlen=self._size)
-        else:
-            self._queue = deque([], maxlen=self._size)
+        self._allocate(self._size)
+        if data is not None:
+            self._fill(np.asarray(data, dtype=np.float64))
 
     # DataQueue properties
     @property
@@ -75,6 +77,36 @@ class DataQueue():
 
 
     # DataQueue private fcns
+    def _allocate(self, size):
+        """
+        Allocate an empty mirrored ring buffer able to hold size entries
+
+        Args:
+            int size - max number of entries held by the queue
+        """
+        self._buffer = np.zeros(2*size, dtype=np.float64)
+        self._head = 0  # idx where the next entry is written
+        self._count = 0 # number of valid entries in the queue
+
+
+    def _fill(self, data):
+        """
+        Copy the latest entries of data into the ring buffer. Data is 
+        organized from oldest to newest entry
+
+        Args:
+            np.array data - entries to append
+        """
+        if self._size == 0:
+            return
+        data = data[-self._size:]
+        num = len(data)
+        self._buffer[:num] = data
+        self._buffer[self._size:self._size + num] = data
+        self._head = num % self._size
+        self._count = num
+
+
     def _change_limit(self, value):
         """
         Change the time limit. If the current amount of data exceeds the new 
@@ -84,8 +116,10 @@ class DataQueue():
         Args:
             num value - new time limit (in seconds)
         """
+        old_data = np.array(self.get_entries(self._count))
         self._size = int(np.ceil( value / (1 / self._RATE_HZ) ))
-        self._queue = deque( self._queue, maxlen=self._size)
+        self._allocate(self._size)
+        self._fill(old_data)
         self._time_limit = value
 
 
@@ -103,46 +137,71 @@ class DataQueue():
 
 
     # DataQueue public fcns
+    def __len__(self):
+        """
+        Return the number of entries in the queue
+        """
+        return self._count
+
+
     def append(self, mag_val):
         """
         Append new entry to queue
         """
-        self._queue.append(mag_val)
+        if self._size == 0:
+            return
+        self._buffer[self._head] = mag_val
+        self._buffer[self._head + self._size] = mag_val
+        self._head += 1
+        if self._head == self._size:
+            self._head = 0
+        if self._count < self._size:
+            self._count += 1
 
 
     def append_xyz(self, x, y, z):
         """
         Append the magnitude of X, Y, and Z component of new entry
         """
-        mag = np.sqrt( np.sum( np.power([x, y, z], 2) ) )
-        self._queue.append(mag)
+        mag = np.sqrt(x*x + y*y + z*z)
+        self.append(mag)
 
 
     def clear(self):
         """
         Clears the queue
         """
-        self._queue.clear()
+        self._head = 0
+        self._count = 0
 
 
     def get_entries(self, num):
         """
         Return the latest number of entries in the queue
+
+        Rtn:
+            read-only np.array view of the latest num entries, ordered from
+            oldest to newest. The view shares memory with the queue and is 
+            only valid until the next append; copy it to keep the values.
+            If num is larger than the number of entries, None is returned
         """
-        # Zero Case
-        if num == 0:
-            return []
         # Too Large Case
-        elif num > len(self._queue):
+        if num > self._count:
             return None
-        # Just Right
-        else:
-            end_idx = num - len(self._queue)
-            self._queue.rotate(end_idx)
-            rtn_list = list(itertools.islice(self._queue, 0, num))
-            self._queue.rotate(-end_idx)
-            return rtn_list
-        
+        # Just Right; the mirrored half keeps the window contiguous
+        end_idx = self._head + self._size
+        rtn_view = self._buffer[end_idx - num:end_idx]
+        rtn_view.flags.writeable = False
+        return rtn_view
+
+
+    def num_entries(self, time_s):
+        """
+        Given a number of seconds, return how many entries 
+        get_latest_entries returns for that duration
+        """
+        return self._convert_time_to_num(time_s)
+
 
     def get_latest_entries(self, time_s):
         """
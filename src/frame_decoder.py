@@ -0,0 +1,222 @@
+#! /usr/bin/env python3
+"""
+File for FrameDecoder Class
+"""
+
+# Project Import
+
+# Python Import
+
+# 3rd-party Import
+import numpy as np
+
+
+def _crc16_table():
+    """
+    Build the byte lookup table of CRC-16/CCITT-FALSE (poly 0x1021)
+    """
+    table = np.zeros(256, dtype=np.uint16)
+    for byte in range(256):
+        crc = byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else crc << 1
+        table[byte] = crc & 0xFFFF
+    return table
+
+
+class FrameDecoder():
+    """
+    Decodes the binary IMU frames sent by the pico firmware when it is built
+    with IMU_BINARY_FRAMES.
+
+    A frame is 18 little-endian bytes: the sync word 0xA5 0x5A, a uint16
+    sequence number, int16 raw accel x, y, z, int16 raw gyro x, y, z, and a
+    CRC-16/CCITT-FALSE of the sequence number and readings. Every frame in a
+    chunk of bytes is located, checked, and converted at once with NumPy;
+    bytes of an incomplete frame are kept for the next chunk. Gaps in the
+    sequence numbers are counted as dropped samples.
+    """
+    # Frame layout
+    FRAME_SIZE = 18
+    SYNC = b'\xa5\x5a'
+    FRAME_DTYPE = np.dtype([('sync', '<u2'), ('seq', '<u2'),
+                            ('accel', '<i2', (3,)), ('gyro', '<i2', (3,)),
+                            ('crc', '<u2')])
+    _CRC_TABLE = _crc16_table()
+
+    def __init__(self, accel_conv=0.000598, gyro_conv=0.01527):
+        """
+        FrameDecoder Constructor
+
+        Args:
+            float accel_conv - m/s/s per raw accel count; default matches the
+                +-2g range set by the firmware
+            float gyro_conv - deg/s per raw gyro count; default matches the
+                +-500 deg/s range set by the firmware
+        """
+        # Set private members
+        ## Constants
+        self._ACCEL_CONV = accel_conv
+        self._GYRO_CONV = gyro_conv
+
+        self.reset()
+
+
+    # FrameDecoder properties
+    @property
+    def num_frames(self):
+        """
+        Return the number of valid frames decoded
+        """
+        return self._num_frames
+
+    @property
+    def dropped(self):
+        """
+        Return the number of samples missing from the sequence numbers
+        """
+        return self._dropped
+
+    @property
+    def crc_errors(self):
+        """
+        Return the number of sync words followed by a frame with a bad CRC
+        """
+        return self._crc_errors
+
+    @property
+    def skipped_bytes(self):
+        """
+        Return the number of bytes discarded outside of valid frames
+        """
+        return self._skipped_bytes
+
+
+    # FrameDecoder public fcns
+    @classmethod
+    def crc16(cls, frames):
+        """
+        Calculate the CRC-16/CCITT-FALSE of many byte strings at once
+
+        Args:
+            2-D np.array frames - uint8 bytes, one byte string per row
+
+        Rtn:
+            np.array of uint16 checksums, one per row
+        """
+        crc = np.full(len(frames), 0xFFFF, dtype=np.uint16)
+        for col in range(frames.shape[1]):
+            crc = (crc << 8) ^ cls._CRC_TABLE[(crc >> 8) ^ frames[:, col]]
+        return crc
+
+
+    @classmethod
+    def encode(cls, seq, accel_raw, gyro_raw):
+        """
+        Pack raw readings into frames the way the firmware does
+
+        Args:
+            array-like seq - sequence number of each frame; wraps at 65536
+            2-D array-like accel_raw - raw accel counts, one row per frame
+            2-D array-like gyro_raw - raw gyro counts, one row per frame
+
+        Rtn:
+            bytes of the frames back to back
+        """
+        frames = np.zeros(len(seq), dtype=cls.FRAME_DTYPE)
+        frames['sync'] = np.frombuffer(cls.SYNC, dtype='<u2')[0]
+        frames['seq'] = np.asarray(seq) % 65536
+        frames['accel'] = accel_raw
+        frames['gyro'] = gyro_raw
+        frame_bytes = frames.view(np.uint8).reshape(-1, cls.FRAME_SIZE)
+        frames['crc'] = cls.crc16(frame_bytes[:, 2:-2])
+        return frames.tobytes()
+
+
+    def reset(self):
+        """
+        Forget buffered bytes, the last sequence number, and the counters
+        """
+        self._partial = b''
+        self._last_seq = None
+        self._num_frames = 0
+        self._dropped = 0
+        self._crc_errors = 0
+        self._skipped_bytes = 0
+
+
+    def decode(self, data):
+        """
+        Decode every complete frame in the buffered bytes plus new data
+
+        Args:
+            bytes data - bytes read from the port
+
+        Rtn:
+            tuple of np.arrays (seq, accel, gyro): the uint16 sequence
+            numbers, accelerations in m/s/s, and angular rates in deg/s; one
+            row per frame
+        """
+        buf = np.frombuffer(self._partial + data, dtype=np.uint8)
+        frames = self._find_frames(buf)
+
+        seq = frames['seq']
+        if len(seq) > 0:
+            # Frames between consecutive sequence numbers were lost
+            prev_seq = int(seq[0]) - 1 if self._last_seq is None \
+                else self._last_seq
+            steps = np.diff(seq.astype(np.int64), prepend=prev_seq) % 65536
+            self._dropped += int(np.sum(steps - 1, where=steps > 0))
+            self._last_seq = int(seq[-1])
+            self._num_frames += len(seq)
+
+        return (seq, frames['accel']*self._ACCEL_CONV,
+                frames['gyro']*self._GYRO_CONV)
+
+
+    # FrameDecoder private fcns
+    def _find_frames(self, buf):
+        """
+        Locate the valid frames in buf and keep the bytes that could start an
+        incomplete frame
+
+        Args:
+            np.array buf - uint8 bytes
+
+        Rtn:
+            structured np.array of the valid frames, FRAME_DTYPE
+        """
+        size = self.FRAME_SIZE
+        # Candidate frames start at every sync word with a full frame after it
+        starts = np.flatnonzero((buf[:-1] == self.SYNC[0]) &
+                                (buf[1:] == self.SYNC[1]))
+        starts = starts[starts + size <= len(buf)]
+        frame_bytes = buf[starts[:, None] + np.arange(size)]
+        frames = frame_bytes.view(self.FRAME_DTYPE)[:, 0]
+        crc_ok = self.crc16(frame_bytes[:, 2:-2]) == frames['crc']
+
+        # Frames of a clean stream never overlap; if a sync word in a payload
+        # passed the CRC, keep the earliest of the overlapping frames
+        valid = crc_ok.copy()
+        if np.any(np.diff(starts[valid]) < size):
+            last_end = -1
+            for idx in np.flatnonzero(crc_ok):
+                valid[idx] = starts[idx] >= last_end
+                if valid[idx]:
+                    last_end = starts[idx] + size
+        good_starts = starts[valid]
+
+        # A sync word inside a valid frame is payload, not a bad frame
+        bad_starts = starts[~crc_ok]
+        owner = np.searchsorted(good_starts, bad_starts, side='right') - 1
+        in_frame = (owner >= 0) & \
+            (bad_starts - good_starts[np.maximum(owner, 0)] < size) \
+            if len(good_starts) > 0 else np.zeros(len(bad_starts), dtype=bool)
+        self._crc_errors += int(np.sum(~in_frame))
+
+        # Only the last FRAME_SIZE - 1 bytes can hold an incomplete frame
+        consumed = good_starts[-1] + size if len(good_starts) > 0 else 0
+        keep_from = max(consumed, len(buf) - (size - 1))
+        self._skipped_bytes += keep_from - len(good_starts)*size
+        self._partial = buf[keep_from:].tobytes()
+        return frames[valid]
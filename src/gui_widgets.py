@@ -38,6 +38,16 @@ class Ball:
         else:
             self.outer_color = outer_color
 
+    @property
+    def rect(self):
+        """
+        Return the pygame.Rect the ball covers
+        """
+        size = 2*self.radius + 4
+        rect = pygame.Rect(0, 0, size, size)
+        rect.center = (round(self.pos[0]), round(self.pos[1]))
+        return rect
+
     def draw(self, bg):
         """
         Draws circle on canvas
@@ -108,18 +118,71 @@ class Textbox:
 
         self.font = font
         self.pos = pos
-        self.dyn_text = dyn_text
-        self.update_dyn_color(dyn_color)
 
         # private because this should not change
         self._static_text = static_text 
         self._static_color = pygame.Color('black')
 
+        # Rendered text is cached until the dynamic text or color changes
+        self._static_img = self.font.render(self._static_text, True, 
+            self._static_color)
+        self._dyn_text = dyn_text
+        self._dyn_img = None
+        self._stale = True          # dyn_img must be re-rendered
+        self._drawn = None          # (text, color) of the last draw
+        self._drawn_rect = None     # area covered by the last draw
+        self.dyn_color = None
+        self.update_dyn_color(dyn_color)
+
         #Get a sense of size for the text box
         self.topleft = pos
         test_img = self.font.render(Textbox.test_char, True, self._static_color)
         self.bottomleft = test_img.get_rect(topleft=pos).bottomleft
 
+    @property
+    def dyn_text(self):
+        """
+        Return the dynamic text
+        """
+        return self._dyn_text
+
+    @dyn_text.setter
+    def dyn_text(self, value):
+        """
+        Setter function for the dynamic text
+        """
+        if value != self._dyn_text:
+            self._dyn_text = value
+            self._stale = True
+
+    @property
+    def dirty(self):
+        """
+        Return True if the textbox changed since it was last drawn
+        """
+        return (self._dyn_text, self.dyn_color) != self._drawn
+
+    @property
+    def rect(self):
+        """
+        Return the pygame.Rect the textbox covers with its current text
+        """
+        self._render()
+        rect = self._static_img.get_rect(topleft=self.pos)
+        if self._dyn_img is not None:
+            rect.union_ip(self._dyn_img.get_rect(topleft=rect.topright))
+        return rect
+
+    @property
+    def dirty_rect(self):
+        """
+        Return the pygame.Rect covering both the last drawn and the current 
+        text
+        """
+        if self._drawn_rect is None:
+            return self.rect
+        return self.rect.union(self._drawn_rect)
+
     def update_dyn_color(self, color):
         """
         Setter function for color
@@ -128,9 +191,10 @@ class Textbox:
             str or RGB tuple val - color of the dyntext
         """
         if (type(color) == str):
-            self.dyn_color = pygame.Color(color)
-        else:
+            color = pygame.Color(color)
+        if color != self.dyn_color:
             self.dyn_color = color
+            self._stale = True
 
     def draw(self, bg):
         """
@@ -139,17 +203,29 @@ class Textbox:
         Args:
             pygame.surface bg - surface to be draw on
         """
+        self._render()
         dyn_pose = self.pos
 
         if len(self._static_text) > 0:
-            static_img = self.font.render(self._static_text, True, 
-                self._static_color)
-            dyn_pose = static_img.get_rect(topleft=self.pos).topright
-            bg.blit(static_img, self.pos)
+            dyn_pose = self._static_img.get_rect(topleft=self.pos).topright
+            bg.blit(self._static_img, self.pos)
         
-        if len(self.dyn_text) > 0:
-            dyn_img = self.font.render(self.dyn_text, True, self.dyn_color)
-            bg.blit(dyn_img, dyn_pose)
+        if self._dyn_img is not None:
+            bg.blit(self._dyn_img, dyn_pose)
+        self._drawn = (self._dyn_text, pygame.Color(self.dyn_color))
+        self._drawn_rect = self.rect
+
+    def _render(self):
+        """
+        Render the dynamic text if it changed since the last render
+        """
+        if self._stale:
+            if len(self._dyn_text) > 0:
+                self._dyn_img = self.font.render(self._dyn_text, True, 
+                    self.dyn_color)
+            else:
+                self._dyn_img = None
+            self._stale = False
 
 
 #Class for Button object
@@ -195,10 +271,13 @@ class Button:
         else:
             self.press_color = press_color
 
-        # Render button
+        # Render button; one image per look, since the text never changes
         self.font = font
         self.text = text
-        self.button_img = font.render(text, True, font_color)
+        self._imgs = {"pressed": font.render(text, True, self.press_color),
+                      "active": font.render(text, True, self.font_color),
+                      "inactive": font.render(text, True, self.fade_color)}
+        self.button_img = self._imgs["active"]
 
         # Build border
         button_pos = (pos[0] - 2, pos[1] - 2)
@@ -219,6 +298,39 @@ class Button:
         # Internal button states
         self._active = True # Whether button can be pressed
         self._pressed = False # Whether button is pressed
+        self._drawn_look = None # Look of the button when last drawn
+
+    @property
+    def look(self):
+        """
+        Return how the button should look: 'pressed', 'active' or 'inactive'
+        """
+        if self._pressed:
+            return "pressed"
+        elif self._active:
+            return "active"
+        return "inactive"
+
+    @property
+    def dirty(self):
+        """
+        Return True if the button's look changed since it was last drawn
+        """
+        return self.look != self._drawn_look
+
+    @property
+    def rect(self):
+        """
+        Return the pygame.Rect the button covers
+        """
+        return self.button_rect.copy()
+
+    @property
+    def dirty_rect(self):
+        """
+        Return the pygame.Rect to redraw when the button is dirty
+        """
+        return self.rect
 
     def activate(self):
         """
@@ -261,23 +373,14 @@ class Button:
         Args:
             pygame.surface bg - surface to be draw on
         """
-        if self._pressed:
-            self.button_img = self.font.render(self.text, True, 
-                self.press_color)
-            bg.blit(self.button_img, self.pos)
-            pygame.draw.rect(bg, self.press_color, 
-                self.button_rect, self.border_width)
-
-        elif self._active:
-            self.button_img = self.font.render(self.text, True, 
-                self.font_color)
-            bg.blit(self.button_img, self.pos)
-            pygame.draw.rect(bg, self.border_color, 
-                self.button_rect, self.border_width)
-
+        look = self.look
+        if look == "pressed":
+            color = self.press_color
+        elif look == "active":
+            color = self.border_color
         else:
-            self.button_img = self.font.render(self.text, True, 
-                self.fade_color)
-            bg.blit(self.button_img, self.pos)
-            pygame.draw.rect(bg, self.fade_color, 
-                self.button_rect, self.border_width)
\ No newline at end of file
+            color = self.fade_color
+        self.button_img = self._imgs[look]
+        bg.blit(self.button_img, self.pos)
+        pygame.draw.rect(bg, color, self.button_rect, self.border_width)
+        self._drawn_look = look
@@ -1,46 +1,162 @@
 #! /usr/bin/env python3
 """
-File for IMU Interface class which manages serial communication 
-with Raspberry pico. 
+File for IMU Interface class which manages serial communication
+with Raspberry pico.
 """
 
 # Python Import
-from time import sleep
+from collections import deque
+import time
 # Project Import
+from src.frame_decoder import FrameDecoder
 
 # 3rd-Party Import
+import numpy as np
 import serial
 
 class ImuInterface:
     """
-    Read data from MPU6050 via a Raspberry pi pico
+    Read data from MPU6050 via a Raspberry pi pico.
+
+    The pico paces the samples with its own timer, so reads never sleep:
+    read_batch takes every byte waiting on the port and parses all the
+    complete samples in it. The spacing of samples on the host is tracked to
+    report the effective rate and jitter; the time between reads is spread 
+    evenly over the samples each read returns, so the stats describe the 
+    sample stream rather than how often the host happens to read.
     """
-    def __init__(self, read_rate_Hz=100, port='/dev/ttyACM0', baudrate=115200):
+    def __init__(self, read_rate_Hz=100, port='/dev/ttyACM0', baudrate=115200,
+        binary=False, num_values=3, read_timeout=0.05):
         """
         Constructor for the MPU6050
 
-        int read_rate_hz - Frequency to read data; default 100Hz
+        int read_rate_hz - Expected frequency of the data; default 100Hz
         string port - Serial port for the device; default /dev/ttyACM0
         int baudrate - bits per second; default 115200
+        bool binary - decode binary frames from firmware built with
+            IMU_BINARY_FRAMES instead of text lines; samples are then
+            [accel x, y, z, gyro x, y, z]
+        int num_values - number of values per text line; lines with a
+            different count are dropped as bad lines
+        float read_timeout - max seconds read_batch waits for the first byte;
+            None waits forever. Default 0.05s
         """
-        self._ser = serial.Serial(port, baudrate)
-        self._sleep_time = 1/read_rate_Hz
+        self._ser = serial.Serial(port, baudrate, timeout=read_timeout)
+        self._RATE_HZ = read_rate_Hz
+        self._NUM_VALUES = 6 if binary else num_values
+        self._decoder = FrameDecoder() if binary else None
+        self._partial = None        # Bytes of an incomplete text line; None
+                                    # until the first newline is seen
+        self._pending = deque()     # Samples read but not returned by read
+        self._bad_lines = 0
+
+        # Arrival stats, a running mean and variance of the gaps between
+        # consecutive samples, each read adding its per-sample gap once per 
+        # sample
+        self._num_samples = 0
+        self._num_gaps = 0
+        self._last_arrival = None
+        self._gap_mean = 0.0
+        self._gap_m2 = 0.0
+        self._max_gap = 0.0
+        self._late = 0
         print(f'Talking to pico: {self._ser}')
 
 
+    # ImuInterface properties
+    @property
+    def RATE_HZ(self):
+        """
+        Return the expected rate of the data
+        """
+        return self._RATE_HZ
+
+    @property
+    def frame_decoder(self):
+        """
+        Return the FrameDecoder of a binary stream; None for text
+        """
+        return self._decoder
+
+    @property
+    def bad_lines(self):
+        """
+        Return the number of text lines that could not be parsed
+        """
+        return self._bad_lines
+
+    @property
+    def jitter_stats(self):
+        """
+        Return a dictionary describing how the samples arrived. The gap of
+        a sample is the time since the previous read divided by the number 
+        of samples the read returned:
+            num_samples - samples read
+            rate_Hz - measured sample rate
+            jitter_ms - standard deviation of the gap between samples
+            max_gap_ms - longest gap between samples
+            late - samples with a gap longer than 1.5 sample periods
+        """
+        num_gaps = self._num_gaps
+        std_gap = np.sqrt(self._gap_m2/num_gaps) if num_gaps > 0 else 0.0
+        return {'num_samples': self._num_samples,
+                'rate_Hz': 1/self._gap_mean if self._gap_mean > 0 else 0.0,
+                'jitter_ms': std_gap*1e3,
+                'max_gap_ms': self._max_gap*1e3,
+                'late': self._late}
+
+
     def read(self):
         """
-        Read and return IMU data
+        Read and return one IMU sample, waiting until one arrives
+
+        Rtn:
+        list with a value per channel, e.g.
+        [acceleration x, y, z] or [acceleration x, y, z, gyroscope x, y, z]
+        """
+        while len(self._pending) == 0:
+            self._pending.extend(self.read_batch().tolist())
+        return self._pending.popleft()
+
+
+    def read_batch(self):
+        """
+        Read every byte waiting on the port, waiting up to the read timeout
+        for the first one, and parse all complete samples in them
 
         Rtn:
-        6 list array with:
-        [acceleration x, y, z, gyroscope x, y, z]
+        2-D np.array with one row per sample, one column per channel; there
+        may be no rows
         """
-        data_read = self._ser.read_until(b'\n') # get the data as bytes
-        data_text = str(data_read,'utf-8') # turn the bytes to a string
-        data = [float(i) for i in data_text.split()] # turn the string into a list of floats
-        sleep(self._sleep_time)
-        return data
+        chunk = self._ser.read(max(1, self._ser.in_waiting))
+        arrival = time.monotonic()
+
+        if self._decoder is not None:
+            _, accel, gyro = self._decoder.decode(chunk)
+            samples = np.hstack((accel, gyro))
+        else:
+            rows = []
+            if self._partial is None:
+                # The port may have been opened mid line; drop the bytes up 
+                # to the first newline
+                _, newline, chunk = chunk.partition(b'\n')
+                if newline:
+                    self._partial = b''
+            if self._partial is not None:
+                *lines, self._partial = (self._partial + chunk).split(b'\n')
+                for line in lines:
+                    try:
+                        values = [float(i) for i in line.split()]
+                    except ValueError:
+                        values = []
+                    if len(values) == self._NUM_VALUES:
+                        rows.append(values)
+                    else:
+                        self._bad_lines += 1
+            samples = np.array(rows).reshape(-1, self._NUM_VALUES)
+
+        self._update_stats(arrival, len(samples))
+        return samples
 
 
     def close(self):
@@ -50,4 +166,37 @@ class ImuInterface:
         self._ser.close()
         self._ser = None
 
-    
+
+    def _update_stats(self, arrival, num_new):
+        """
+        Add the samples of one read to the running stats
+
+        Args:
+            float arrival - host monotonic time the samples arrived
+            int num_new - number of samples that arrived
+        """
+        if num_new == 0:
+            return
+        if self._last_arrival is not None:
+            # Samples read together were spread over the time since the 
+            # last read
+            self._add_gap((arrival - self._last_arrival)/num_new, num_new)
+        self._last_arrival = arrival
+        self._num_samples += num_new
+
+
+    def _add_gap(self, gap, count=1):
+        """
+        Add the gap between samples to the running stats
+
+        Args:
+            float gap - seconds between the arrivals of consecutive samples
+            int count - number of samples with this gap
+        """
+        self._num_gaps += count
+        delta = gap - self._gap_mean
+        self._gap_mean += delta*count/self._num_gaps
+        self._gap_m2 += count*delta*(gap - self._gap_mean)
+        self._max_gap = max(self._max_gap, gap)
+        if gap > 1.5/self._RATE_HZ:
+            self._late += count
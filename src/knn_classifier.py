@@ -0,0 +1,165 @@
+#! /usr/bin/env python3
+"""
+File for KnnClassifier Class
+"""
+
+# Project Import
+
+# Python Import
+import json
+
+# 3rd-party Import
+import numpy as np
+from scipy.spatial import cKDTree
+
+class KnnClassifier():
+    """
+    Lightweight k nearest neighbors classifier for inference only.
+
+    Reproduces predict_proba of a fitted sklearn KNeighborsClassifier using
+    the euclidean metric with 'uniform' or 'distance' weights, from a compact
+    artifact that only holds the training points, their labels, k, and the
+    weighting. No sklearn import is needed to load or run it.
+    """
+    def __init__(self, points, labels, classes, n_neighbors,
+        weights='uniform'):
+        """
+        KnnClassifier Constructor
+
+        Args:
+            2-D np.array points - training points, one per row
+            np.array labels - index into classes of each training point
+            np.array classes - class names
+            int n_neighbors - number of neighbors voting on a prediction
+            string weights - 'uniform' or 'distance'; default 'uniform'
+        """
+        if weights not in ('uniform', 'distance'):
+            raise ValueError(f"ERROR: Invalid weights option; options are "
+                             f"'uniform' and 'distance'; recieved {weights}")
+        if n_neighbors < 1 or n_neighbors > len(points):
+            raise ValueError(f"ERROR: n_neighbors must be in range "
+                             f"[1, {len(points)}]; recieved {n_neighbors}")
+
+        # Set public members
+        self.classes_ = np.asarray(classes).astype(object)
+        self.n_neighbors = int(n_neighbors)
+        self.weights = weights
+
+        # Set private members
+        ## Distances are calculated in float64 as sklearn does
+        self._points = np.ascontiguousarray(points, dtype=np.float64)
+        self._labels = np.asarray(labels, dtype=np.intp)
+        self._tree = cKDTree(self._points)
+
+
+    # KnnClassifier properties
+    @property
+    def n_features_in_(self):
+        """
+        Return the number of features of each point
+        """
+        return self._points.shape[1]
+
+
+    # KnnClassifier public fcns
+    @classmethod
+    def from_sklearn(cls, model):
+        """
+        Build a KnnClassifier from a fitted sklearn KNeighborsClassifier
+
+        Args:
+            KNeighborsClassifier model - fitted model with a euclidean metric
+
+        Rtn:
+            KnnClassifier
+        """
+        if model.effective_metric_ != 'euclidean':
+            raise ValueError(f"ERROR: Only the euclidean metric is supported;"
+                             f" recieved {model.effective_metric_}")
+        return cls(model._fit_X, model._y, model.classes_,
+                   model.n_neighbors, model.weights)
+
+
+    @classmethod
+    def load(cls, filepath):
+        """
+        Load a compact artifact written by save
+
+        Args:
+            string filepath - filepath to the .npz artifact
+
+        Rtn:
+            tuple of (KnnClassifier, dict of the info saved with it)
+        """
+        with np.load(filepath, allow_pickle=False) as artifact:
+            model = cls(artifact['points'], artifact['labels'],
+                        artifact['classes'], int(artifact['n_neighbors']),
+                        str(artifact['weights']))
+            info = json.loads(str(artifact['info']))
+        return model, info
+
+
+    def save(self, filepath, info=None):
+        """
+        Write the classifier as a compact .npz artifact; training points are
+        stored as float32 and labels as small ints
+
+        Args:
+            string filepath - filepath of the artifact
+            dict info - json serializable data saved with the classifier, 
+                e.g. metrics and metadata
+        """
+        label_type = np.uint8 if len(self.classes_) <= 256 else np.intp
+        np.savez(filepath,
+                 points=self._points.astype(np.float32),
+                 labels=self._labels.astype(label_type),
+                 classes=self.classes_.astype(str),
+                 n_neighbors=self.n_neighbors,
+                 weights=self.weights,
+                 info=json.dumps(info if info is not None else {}))
+
+
+    def predict_proba(self, X):
+        """
+        Calculate the class probabilities of each query point
+
+        Args:
+            2-D array-like X - query points, one per row
+
+        Rtn:
+            2-D np.array of probabilities; one row per query, one column per
+            class in the order of classes_
+        """
+        X = np.asarray(X, dtype=np.float64)
+        # A list of k keeps the neighbor axis when n_neighbors is 1
+        neigh_dist, neigh_idx = self._tree.query(
+            X, k=list(range(1, self.n_neighbors + 1)))
+
+        if self.weights == 'uniform':
+            weights = np.ones(neigh_idx.shape)
+        else:
+            # Exact matches take all the weight, as in sklearn
+            with np.errstate(divide='ignore'):
+                weights = 1/neigh_dist
+            exact = np.isinf(weights)
+            exact_rows = np.any(exact, axis=1)
+            weights[exact_rows] = exact[exact_rows]
+
+        probs = np.zeros((len(X), len(self.classes_)))
+        rows = np.broadcast_to(np.arange(len(X))[:, None], neigh_idx.shape)
+        np.add.at(probs, (rows, self._labels[neigh_idx]), weights)
+        probs /= probs.sum(axis=1, keepdims=True)
+        return probs
+
+
+    def predict(self, X):
+        """
+        Predict the class of each query point
+
+        Args:
+            2-D array-like X - query points, one per row
+
+        Rtn:
+            np.array of class names
+        """
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
@@ -0,0 +1,224 @@
+#! /usr/bin/env python3
+"""
+File for LatencyProfiler Class
+"""
+
+# Project Import
+
+# Python Import
+import json
+import time
+
+# 3rd-party Import
+import numpy as np
+
+class LatencyProfiler():
+    """
+    Records how long each stage of the execution loop takes.
+
+    Latencies are read from the monotonic clock in nanoseconds and counted in
+    log-linear histograms, HDR style: values below 64ns get a bucket each and
+    every power of two above is split into 32 buckets, so a bucket is within
+    about 3% of any value in it while the memory stays fixed. Recording is an
+    integer bucket lookup, cheap enough to leave on every sample.
+    """
+    _SUB_BITS = 5                   # 32 buckets per power of two
+    _SUB_COUNT = 1 << _SUB_BITS
+    _NUM_BUCKETS = 64*_SUB_COUNT    # covers every 64-bit latency
+
+    def __init__(self, deadline_ms=10.0, stages=()):
+        """
+        LatencyProfiler Constructor
+
+        Args:
+            float deadline_ms - latency budget of a stage; records over it
+                count as deadline misses. Default 10ms, one sample at 100Hz
+            list of strings stages - names of stages in the order to report
+                them; other stages are reported in the order first recorded
+        """
+        # Set private members
+        ## Constants
+        self._DEADLINE_NS = int(deadline_ms*1e6)
+
+        self._counts = {}   # stage name -> list of bucket counts
+        self._num = {}      # stage name -> number of records
+        self._misses = {}   # stage name -> records over the deadline
+        self._max = {}      # stage name -> longest latency in ns
+        self._sum = {}      # stage name -> sum of latencies in ns
+        for stage in stages:
+            self._add_stage(stage)
+
+
+    # LatencyProfiler properties
+    @property
+    def DEADLINE_MS(self):
+        """
+        Return the latency budget in milliseconds
+        """
+        return self._DEADLINE_NS/1e6
+
+    @property
+    def stages(self):
+        """
+        Return the names of the stages with records, in report order
+        """
+        return [stage for stage in self._counts if self._num[stage] > 0]
+
+
+    # LatencyProfiler public fcns
+    @staticmethod
+    def now():
+        """
+        Return the monotonic clock in nanoseconds
+        """
+        return time.monotonic_ns()
+
+
+    def lap(self, stage, start_ns):
+        """
+        Record the time since start_ns for a stage
+
+        Args:
+            string stage - name of the stage
+            int start_ns - monotonic clock when the stage started
+
+        Rtn:
+            int monotonic clock now, the start of the next stage
+        """
+        now_ns = time.monotonic_ns()
+        self.record(stage, now_ns - start_ns)
+        return now_ns
+
+
+    def record(self, stage, latency_ns):
+        """
+        Record one latency of a stage
+
+        Args:
+            string stage - name of the stage
+            int latency_ns - latency in nanoseconds
+        """
+        latency_ns = max(int(latency_ns), 0)
+        if stage not in self._counts:
+            self._add_stage(stage)
+        self._counts[stage][self._bucket(latency_ns)] += 1
+        self._num[stage] += 1
+        self._sum[stage] += latency_ns
+        if latency_ns > self._max[stage]:
+            self._max[stage] = latency_ns
+        if latency_ns > self._DEADLINE_NS:
+            self._misses[stage] += 1
+
+
+    def percentile(self, stage, percent):
+        """
+        Estimate a percentile of a stage's latencies from its histogram
+
+        Args:
+            string stage - name of the stage
+            float percent - percentile in the range [0, 100]
+
+        Rtn:
+            float latency in nanoseconds; the lower edge of the bucket the
+            percentile falls in, capped at the max latency
+        """
+        counts = np.asarray(self._counts[stage])
+        rank = max(int(np.ceil(percent/100*counts.sum())), 1)
+        bucket = int(np.searchsorted(np.cumsum(counts), rank))
+        return float(min(self._bucket_floor(bucket), self._max[stage]))
+
+
+    def summary(self):
+        """
+        Summarize the latencies of every stage
+
+        Rtn:
+            dict with the deadline in ms and, for each stage, a dict of the
+            count, mean, p50, p90, p99 and max in microseconds, and the
+            number of deadline misses
+        """
+        stages = {}
+        for stage in self.stages:
+            count = self._num[stage]
+            stages[stage] = {
+                "count": count,
+                "mean_us": self._sum[stage]/count/1e3,
+                "p50_us": self.percentile(stage, 50)/1e3,
+                "p90_us": self.percentile(stage, 90)/1e3,
+                "p99_us": self.percentile(stage, 99)/1e3,
+                "max_us": self._max[stage]/1e3,
+                "deadline_misses": self._misses[stage]}
+        return {"deadline_ms": self.DEADLINE_MS, "stages": stages}
+
+
+    def report(self):
+        """
+        Print the summary as a table
+        """
+        print(f"Stage latencies, deadline {self.DEADLINE_MS:g}ms")
+        print(f"{'stage':<14}{'count':>8}{'mean[us]':>10}{'p50[us]':>10}"
+              f"{'p99[us]':>10}{'max[us]':>10}{'misses':>8}")
+        for stage, stats in self.summary()["stages"].items():
+            print(f"{stage:<14}{stats['count']:>8}{stats['mean_us']:>10.1f}"
+                  f"{stats['p50_us']:>10.1f}{stats['p99_us']:>10.1f}"
+                  f"{stats['max_us']:>10.1f}{stats['deadline_misses']:>8}")
+
+
+    def save_json(self, filepath, info=None):
+        """
+        Write the summary and the raw histograms as JSON
+
+        Args:
+            string filepath - filepath of the json file
+            dict info - json serializable data saved with the summary, e.g.
+                the run parameters
+        """
+        data = self.summary()
+        data["info"] = info if info is not None else {}
+        # Only the non-empty buckets, as [lower edge in ns, count] pairs
+        data["histograms"] = {
+            stage: [[self._bucket_floor(i), n] for i, n in enumerate(counts)
+                    if n > 0]
+            for stage, counts in self._counts.items() if self._num[stage] > 0}
+        with open(filepath, 'w') as json_file:
+            json.dump(data, json_file, indent=2)
+
+
+    def reset(self):
+        """
+        Forget every recorded latency
+        """
+        for stage in self._counts:
+            self._add_stage(stage)
+
+
+    # LatencyProfiler private fcns
+    def _add_stage(self, stage):
+        """
+        Make the empty histogram and counters of a stage
+        """
+        self._counts[stage] = [0]*self._NUM_BUCKETS
+        self._num[stage] = 0
+        self._misses[stage] = 0
+        self._max[stage] = 0
+        self._sum[stage] = 0
+
+
+    def _bucket(self, latency_ns):
+        """
+        Return the histogram bucket of a latency
+        """
+        shift = latency_ns.bit_length() - self._SUB_BITS - 1
+        if shift <= 0:
+            return latency_ns
+        return shift*self._SUB_COUNT + (latency_ns >> shift)
+
+
+    def _bucket_floor(self, bucket):
+        """
+        Return the smallest latency in a histogram bucket
+        """
+        if bucket < 2*self._SUB_COUNT:
+            return bucket
+        shift = bucket//self._SUB_COUNT - 1
+        return (bucket % self._SUB_COUNT + self._SUB_COUNT) << shift
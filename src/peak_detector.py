@@ -0,0 +1,108 @@
+#! /usr/bin/env python3
+"""
+File for PeakDetector Class
+"""
+
+# Project Import
+
+# Python Import
+
+# 3rd-party Import
+
+
+class PeakDetector():
+    """
+    Online local maximum detector that consumes one sample at a time.
+
+    Mirrors scipy.signal.find_peaks(x, distance=distance) in a streaming
+    fashion: a peak is reported once the following sample is lower (plateaus
+    report their middle sample) and peaks closer than distance samples to the
+    last reported peak are dropped unless they are higher, in which case they
+    replace it. Feed negated samples to detect valleys.
+    """
+    def __init__(self, distance=40, start_idx=0):
+        """
+        PeakDetector Constructor
+
+        Args:
+            int distance - minimum number of samples between peaks; default 40
+            int start_idx - absolute sample index of the first sample fed
+        """
+        # Set private members
+        ## Constants
+        self._DISTANCE = distance
+
+        self.reset(start_idx)
+
+
+    # PeakDetector properties
+    @property
+    def DISTANCE(self):
+        """
+        Return the minimum number of samples between peaks
+        """
+        return self._DISTANCE
+
+    @property
+    def last_peak(self):
+        """
+        Return the absolute sample index of the last reported peak; None if
+        no peak has been reported
+        """
+        return self._last_idx
+
+
+    # PeakDetector public fcns
+    def reset(self, start_idx=0):
+        """
+        Forget all samples and peaks
+
+        Args:
+            int start_idx - absolute sample index of the next sample fed
+        """
+        self._idx = start_idx - 1   # Absolute idx of the latest sample
+        self._prev_val = None       # Value of the latest sample
+        self._rise_idx = None       # Idx where the current rise levelled off
+        self._last_idx = None       # Idx of the last reported peak
+        self._last_val = None       # Value of the last reported peak
+
+
+    def update(self, value):
+        """
+        Consume the next sample
+
+        Args:
+            float value - newest sample
+
+        Rtn:
+            None if no peak was found, else a tuple of
+            (absolute peak index, replaced) where replaced is True if the
+            peak supersedes the last reported peak
+        """
+        self._idx += 1
+        prev_val = self._prev_val
+        self._prev_val = value
+        if prev_val is None:
+            return None
+
+        # Rising edge; a plateau keeps the idx where it started
+        if value > prev_val:
+            self._rise_idx = self._idx
+            return None
+        elif value == prev_val or self._rise_idx is None:
+            return None
+
+        # Falling edge after a rise, the peak is the middle of the plateau
+        peak_idx = (self._rise_idx + self._idx - 1)//2
+        self._rise_idx = None
+
+        if self._last_idx is None or \
+            peak_idx - self._last_idx >= self._DISTANCE:
+            self._last_idx = peak_idx
+            self._last_val = prev_val
+            return peak_idx, False
+        elif prev_val > self._last_val:
+            self._last_idx = peak_idx
+            self._last_val = prev_val
+            return peak_idx, True
+        return None
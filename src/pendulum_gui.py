@@ -31,6 +31,7 @@ class PendulumGUI:
 
         # Set private member
         self._death = False #Flag to kill gui during live playback
+        self._latest = None #Latest state published by the control loop
 
         pygame.init()
         # Build Scenery
@@ -76,26 +77,57 @@ class PendulumGUI:
             self.second_line = gw.Line(150, 'black', 26)
             self.second_ball = gw.Ball((500, 750), 24, 'red', 4, 'black')
 
+        # Widgets redrawn when they change, in drawing order
+        self._widgets = [self.log_box, self.play, self.pause, self.reset,
+                         self.state_box, self.step_count_box, self.swing_msg]
+        self._drawn_pend_rect = None # Area of the pendulum when last drawn
+        self._drawn_pend_pos = None  # Positions of the masses when last drawn
 
-    def draw(self):
+
+    def draw(self, full=False):
         """
-        Draw all widget in the gui
+        Draw the gui. Only the areas of widgets that changed and the area 
+        swept by the pendulum are redrawn and sent to the display
+
+        Args:
+            bool full - redraw and update the whole screen
         """
-        # Draw and update Gui
-        self.screen.fill(pygame.Color('gray'))
+        pend_rect = self._pendulum_rect()
+        pend_pos = self._pendulum_pos()
+        if full or self._drawn_pend_rect is None:
+            rects = [self.screen.get_rect()]
+        else:
+            rects = [widget.dirty_rect for widget in self._widgets 
+                     if widget.dirty]
+            if pend_pos != self._drawn_pend_pos:
+                rects.append(pend_rect.union(self._drawn_pend_rect))
+        if len(rects) == 0:
+            return
+
+        # Repaint the scene clipped to each changed area, so widgets that 
+        # overlap the area are restored too
+        for rect in rects:
+            self.screen.set_clip(rect)
+            self._draw_scene()
+        self.screen.set_clip(None)
+        self._drawn_pend_rect = pend_rect
+        self._drawn_pend_pos = pend_pos
 
-        # Menu
-        self.log_box.draw(self.screen)
-        self.play.draw(self.screen)
-        self.pause.draw(self.screen)
-        self.reset.draw(self.screen)
+        # Update canvas
+        pygame.display.update(rects)
+
+
+    def _draw_scene(self):
+        """
+        Draw the background and every widget
+        """
+        self.screen.fill(pygame.Color('gray'))
 
-        # Status Panel
-        self.state_box.draw(self.screen)
-        self.step_count_box.draw(self.screen)
+        # Menu, Status Panel, and swing message
+        for widget in self._widgets:
+            widget.draw(self.screen)
 
         # Pendulum
-        self.swing_msg.draw(self.screen)
         self.first_line.draw(self.screen, self.pivot.pos, self.first_ball.pos)
         self.pivot.draw(self.screen)
         if self.double_pend:
@@ -104,8 +136,24 @@ class PendulumGUI:
             self.second_ball.draw(self.screen)
         self.first_ball.draw(self.screen)
 
-        # Update canvas
-        pygame.display.flip()
+
+    def _pendulum_pos(self):
+        """
+        Return the positions of the pendulum masses
+        """
+        if self.double_pend:
+            return (self.first_ball.pos, self.second_ball.pos)
+        return (self.first_ball.pos,)
+
+
+    def _pendulum_rect(self):
+        """
+        Return the pygame.Rect covering the pendulum at its current position
+        """
+        rect = self.pivot.rect.union(self.first_ball.rect)
+        if self.double_pend:
+            rect.union_ip(self.second_ball.rect)
+        return rect
 
 
     def run_playback(self, logs_dict, fps=100):
@@ -189,7 +237,7 @@ class PendulumGUI:
         self.log_box.dyn_text = f"Live!"
 
         # Draw and update Gui
-        self.draw()
+        self.draw(full=True)
     
 
     def live_update(self, class_state, steps, theta1, theta2=None):
@@ -224,6 +272,58 @@ class PendulumGUI:
         return not self._death
 
 
+    def publish(self, class_state, steps, theta1, theta2=None):
+        """
+        Publish the latest state for run_live to draw. Safe to call from the
+        control loop's thread; only the newest state is kept
+
+        Args:
+            string class_state: current state to be displayed
+            num steps: how many steps have been taken
+            num theta1: angle of the first link (in radians)
+            num theta2: if a double_pendulum simulation, angle of the second
+                link (in radians). 
+
+        Rtn:
+            bool False once the gui has been closed
+        """
+        # Replacing the tuple is atomic, so the reader never sees a mix
+        self._latest = (class_state, steps, theta1, theta2)
+        return not self._death
+
+
+    def run_live(self, keep_running, fps=60):
+        """
+        Draw the state published by the control loop at a capped frame rate,
+        so the control loop never waits on the display
+
+        Args:
+            fcn keep_running - returns False once the control loop is done
+            int fps - maximum rate of the animation; default 60
+        """
+        clock = pygame.time.Clock()
+        drawn = None
+        while keep_running() and not self._death:
+            # Check for death
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    self._death = True
+
+            # Only redraw when a new state was published
+            latest = self._latest
+            if latest is not None and latest is not drawn:
+                class_state, steps, theta1, theta2 = latest
+                self._update_status_panel(class_state, steps)
+                if self.double_pend:
+                    self._update_pendulum(theta1, theta2)
+                else:
+                    self._update_pendulum(theta1)
+                self.draw()
+                drawn = latest
+
+            clock.tick(fps)
+
+
     def await_death(self):
         """
         Disable gui and wait for user to close gui
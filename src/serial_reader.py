@@ -0,0 +1,202 @@
+#! /usr/bin/env python3
+"""
+File for SerialReader Class
+"""
+
+# Project Import
+
+# Python Import
+from collections import deque
+import threading
+import time
+
+# 3rd-party Import
+
+
+class SerialReader():
+    """
+    Reads IMU samples on a background thread so the caller never blocks on
+    the serial port.
+
+    Each batch read from the ImuInterface is stamped with the host monotonic
+    time it arrived and its samples are pushed on a bounded deque; when the
+    deque is full the oldest sample is dropped and counted as an overflow. A
+    consumer drains the samples in batches. deque appends and pops are
+    atomic, so no lock is shared between the threads.
+    """
+    def __init__(self, imu, max_samples=1024):
+        """
+        SerialReader Constructor
+
+        Args:
+            ImuInterface imu - open interface to the device; its read timeout
+                bounds how long stop waits on the thread
+            int max_samples - capacity of the sample queue; default 1024
+        """
+        if max_samples < 1:
+            raise ValueError(f"ERROR: max_samples must be at least 1; "
+                             f"recieved {max_samples}")
+
+        # Set private members
+        ## Constants
+        self._MAX_SAMPLES = max_samples
+
+        self._imu = imu
+        self._samples = deque(maxlen=max_samples) # (timestamp, values)
+        self._new_data = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._error = None      # Exception that ended the reader thread
+
+        ## Counters, only written by the reader thread
+        self._num_samples = 0
+        self._overflows = 0
+
+
+    # SerialReader properties
+    @property
+    def MAX_SAMPLES(self):
+        """
+        Return the capacity of the sample queue
+        """
+        return self._MAX_SAMPLES
+
+    @property
+    def imu(self):
+        """
+        Return the ImuInterface being read
+        """
+        return self._imu
+
+    @property
+    def num_samples(self):
+        """
+        Return the number of samples read since start
+        """
+        return self._num_samples
+
+    @property
+    def overflows(self):
+        """
+        Return the number of samples dropped because the queue was full
+        """
+        return self._overflows
+
+    @property
+    def backlog(self):
+        """
+        Return the number of samples waiting to be drained
+        """
+        return len(self._samples)
+
+    @property
+    def running(self):
+        """
+        Return True while the reader thread is alive
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def error(self):
+        """
+        Return the exception that stopped the reader thread; None otherwise
+        """
+        return self._error
+
+    # SerialReader public fcns
+    def start(self):
+        """
+        Start the reader thread
+        """
+        if self.running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._read_loop,
+                                        name="SerialReader", daemon=True)
+        self._thread.start()
+
+
+    def stop(self):
+        """
+        Stop the reader thread. Samples already queued can still be drained
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+    def wait(self, timeout=None):
+        """
+        Wait until samples are queued or the reader thread stops
+
+        Args:
+            float timeout - max seconds to wait; None waits forever
+
+        Rtn:
+            bool True if samples are waiting to be drained
+        """
+        if not self._samples and self.running:
+            self._new_data.wait(timeout)
+        return len(self._samples) > 0
+
+
+    def drain(self, max_batch=None):
+        """
+        Pop the queued samples, oldest first
+
+        Args:
+            int max_batch - max number of samples to pop; None pops all
+
+        Rtn:
+            list of (float host monotonic timestamp, list of floats) tuples
+        """
+        # Clear before popping so a sample pushed mid drain sets it again
+        self._new_data.clear()
+        batch = []
+        while max_batch is None or len(batch) < max_batch:
+            try:
+                batch.append(self._samples.popleft())
+            except IndexError:
+                break
+        if self._samples:
+            self._new_data.set()
+        return batch
+
+
+    # SerialReader private fcns
+    def _read_loop(self):
+        """
+        Read batches of samples until stopped
+        """
+        try:
+            while not self._stop_event.is_set():
+                samples = self._imu.read_batch()
+                if len(samples) == 0:
+                    continue
+                timestamp = time.monotonic()
+                for values in samples.tolist():
+                    self._push(timestamp, values)
+                self._new_data.set()
+        except Exception as err:
+            # pyserial raises SerialException (an OSError) or TypeError when
+            # the port is closed or unplugged under the thread; any error is
+            # kept for the consumer to raise instead of ending silently
+            if not self._stop_event.is_set():
+                self._error = err
+        finally:
+            self._new_data.set()
+
+
+    def _push(self, timestamp, values):
+        """
+        Queue a sample, dropping the oldest one if the queue is full
+
+        Args:
+            float timestamp - host monotonic time the sample arrived
+            list values - floats of the sample
+        """
+        if len(self._samples) == self._MAX_SAMPLES:
+            self._overflows += 1
+        self._samples.append((timestamp, values))
+        self._num_samples += 1
@@ -0,0 +1,174 @@
+#! /usr/bin/env python3
+"""
+File for SlidingWelch Class
+"""
+
+# Project Import
+
+# Python Import
+
+# 3rd-party Import
+import numpy as np
+
+class SlidingWelch():
+    """
+    Streaming power spectral density estimator for a sliding window.
+
+    Reproduces scipy.signal.welch(data, fs, nperseg=len(data)) (one hann
+    windowed, mean detrended segment with density scaling) by updating a
+    sliding DFT with each new sample instead of transforming the whole window.
+    The hann window is applied in the frequency domain as a 3-tap kernel, so an
+    update costs O(bins).
+    """
+    def __init__(self, sample_rate=100, resync_interval=None):
+        """
+        SlidingWelch Constructor
+
+        Args:
+            num sample_rate - sample rate of the incoming data; default 100Hz
+            int resync_interval - number of slid samples before the DFT is
+                recomputed from scratch to bound round-off drift; default None
+                resyncs once every window length
+        """
+        # Set public members
+        self.sample_rate = sample_rate
+
+        # Set private members
+        self._RESYNC_INTERVAL = resync_interval
+        self.reset()
+
+
+    # SlidingWelch properties
+    @property
+    def freqs(self):
+        """
+        Return the array of sample frequencies; None before the first update
+        """
+        return self._freqs
+
+    @property
+    def psd(self):
+        """
+        Return the power spectral density of the current window; None before
+        the first update
+        """
+        return self._psd
+
+
+    # SlidingWelch private fcns
+    def _calc_psd(self):
+        """
+        Calculate the power spectral density from the sliding DFT bins
+        """
+        # Apply hann window in freq domain: W[k] = X[k]/2 - X[k-1]/4 - X[k+1]/4
+        # Removing the mean (detrend) zeroes X[0]; X[-1] is conj(X[1])
+        X = self._bins
+        W = 0.5*X[:-1] - 0.25*X[1:]
+        W[2:] -= 0.25*X[1:-2]
+        W[0] = -0.5*X[1].real
+
+        self._psd = (W.real*W.real + W.imag*W.imag)*self._scale
+
+
+    def _sync(self, data):
+        """
+        Recompute the DFT bins of data from scratch
+
+        Args:
+            np.array data - window of samples ordered from oldest to newest
+        """
+        num = len(data)
+        if num != self._N:
+            self._setup(num)
+        self._ring = np.array(data, dtype=np.float64)
+        self._pos = 0
+        self._bins = np.fft.fft(self._ring)[:self._num_bins + 1]
+        self._since_sync = 0
+
+
+    def _setup(self, num):
+        """
+        Set up the constants for a window of num samples
+
+        Args:
+            int num - length of the window
+        """
+        self._N = num
+        self._num_bins = num//2 + 1
+        self._freqs = np.fft.rfftfreq(num, 1/self.sample_rate)
+        self._twiddle = np.exp(2j*np.pi*np.arange(self._num_bins + 1)/num)
+
+        # Density scaling of a periodic hann window: sum(w^2) = 3N/8
+        self._scale = np.full(self._num_bins,
+                              2/(self.sample_rate*0.375*num))
+        self._scale[0] /= 2
+        if num % 2 == 0:
+            self._scale[-1] /= 2
+
+        if self._RESYNC_INTERVAL is None:
+            self._resync = num
+        else:
+            self._resync = self._RESYNC_INTERVAL
+        self._max_slide = max(1, int(np.log2(num)))
+
+
+    # SlidingWelch public fcns
+    def reset(self):
+        """
+        Forget the current window
+        """
+        self._N = 0
+        self._freqs = None
+        self._bins = None
+        self._psd = None
+        self._ring = None
+        self._pos = 0
+        self._since_sync = 0
+
+
+    def update(self, data, num_new=1):
+        """
+        Update the spectrum with the latest window of data
+
+        Args:
+            list-like data - window of samples ordered from oldest to newest
+            int num_new - number of samples at the end of data that were not
+                in the previous window
+
+        Rtn:
+            tuple of np.arrays (freqs, psd) matching scipy.signal.welch
+        """
+        num = len(data)
+        # Slide if cheaper than a fresh transform, else recompute
+        if num != self._N or num_new > self._max_slide or \
+            self._since_sync + num_new > self._resync:
+            self._sync(data)
+        else:
+            for val in data[num - num_new:]:
+                old_val = self._ring[self._pos]
+                self._ring[self._pos] = val
+                self._pos += 1
+                if self._pos == self._N:
+                    self._pos = 0
+                self._bins += val - old_val
+                self._bins *= self._twiddle
+            self._since_sync += num_new
+        self._calc_psd()
+
+        return self._freqs, self._psd
+
+
+    def get_features(self):
+        """
+        Return classifier features of the current window; call update first
+
+        Rtn:
+            tuple of (dominant frequency, intensity at dominant frequency,
+                spectral entropy)
+        """
+        Pxx = self._psd
+        max_idx = np.argmax(Pxx)
+        P_sum = Pxx.sum()
+        Pxx_norm = Pxx[Pxx > 0]/P_sum
+        entropy = -np.sum(Pxx_norm*np.log(Pxx_norm))
+        return self._freqs[max_idx], Pxx[max_idx], entropy
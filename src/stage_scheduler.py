@@ -0,0 +1,106 @@
+#! /usr/bin/env python3
+"""
+File for StageScheduler Class
+"""
+
+# Project Import
+
+# Python Import
+
+# 3rd-party Import
+import numpy as np
+
+class StageScheduler():
+    """
+    Decimates pipeline stages so each refreshes at its own hop size while the
+    execution loop keeps running every sample
+    """
+    def __init__(self, data_rate_Hz=100):
+        """
+        StageScheduler Constructor
+
+        Args:
+            int data_rate_Hz - frequency of the incoming data; default 100Hz
+        """
+        # Set private members
+        self._RATE_HZ = data_rate_Hz
+        self._hops = {}    # stage name -> hop size in samples
+        self._elapsed = {} # stage name -> samples since the stage last ran
+
+
+    # StageScheduler properties
+    @property
+    def RATE_HZ(self):
+        """
+        Return the rate of the incoming data
+        """
+        return self._RATE_HZ
+
+    @property
+    def hops(self):
+        """
+        Return a dictionary of the hop size (in samples) of each stage
+        """
+        return dict(self._hops)
+
+
+    # StageScheduler public fcns
+    def add_stage(self, name, hop_samples=1, hop_s=None):
+        """
+        Register a stage. The stage is due on the first poll and then once
+        every hop
+
+        Args:
+            string name - name of the stage
+            int hop_samples - number of samples between refreshes; default 1
+            float hop_s - seconds between refreshes; overrides hop_samples
+                when provided. Rounded to the nearest sample
+        """
+        if hop_s is not None:
+            hop_samples = int(np.round(hop_s*self._RATE_HZ))
+        if hop_samples < 1:
+            raise ValueError(f"ERROR: Hop size of stage '{name}' must be at "
+                             f"least one sample; recieved {hop_samples}")
+        self._hops[name] = hop_samples
+        self._elapsed[name] = None
+
+
+    def tick(self, num=1):
+        """
+        Advance every stage by a number of samples
+
+        Args:
+            int num - number of new samples; default 1
+        """
+        for name in self._elapsed:
+            if self._elapsed[name] is not None:
+                self._elapsed[name] += num
+
+
+    def poll(self, name):
+        """
+        Check if a stage is due. A due stage is marked as run
+
+        Args:
+            string name - name of the stage
+
+        Rtn:
+            int number of samples since the stage last ran if due, else 0.
+            The first poll of a stage returns the stage's hop size
+        """
+        elapsed = self._elapsed[name]
+        if elapsed is None:
+            self._elapsed[name] = 0
+            return self._hops[name]
+        elif elapsed >= self._hops[name]:
+            self._elapsed[name] = 0
+            return elapsed
+        return 0
+
+
+    def reset(self):
+        """
+        Make every stage due on the next poll
+        """
+        for name in self._elapsed:
+            self._elapsed[name] = None
@@ -6,9 +6,11 @@ File for Trajectory Look-up Class
 # Project Import
 
 # Python Import
+import csv
 
 # 3rd-Party Import
-import pandas as pd
+import numpy as np
+from scipy import signal
 
 class TrajectoryLookUp():
     """
@@ -30,14 +32,19 @@ class TrajectoryLookUp():
             float EPSILON - defaults to 0.01
                 precision to compare internal values
         """
-        # Build profiles
-        self._position_profiles = {}
-        self._possible_speeds = []
-        for speed_key in profiles:
-            df = pd.read_csv(profiles[speed_key], names=["Position","Torque"])
-            self._position_profiles[speed_key] = df["Position"]
-            self._possible_speeds.append(speed_key)
-        self._possible_speeds.sort()
+        # Build profiles; one contiguous table with a slice per speed
+        self._possible_speeds = sorted(profiles)
+        positions = [self._read_profile(profiles[speed_key]) 
+                     for speed_key in self._possible_speeds]
+        self._profile_lengths = {}
+        self._profile_offsets = {}
+        offset = 0
+        for speed_key, position in zip(self._possible_speeds, positions):
+            self._profile_lengths[speed_key] = len(position)
+            self._profile_offsets[speed_key] = offset
+            offset += len(position)
+        self._position_table = np.concatenate(positions)
+        self._build_phase_index(positions)
 
         # Parameters
         self._EPSILON = EPSILON
@@ -55,6 +62,14 @@ class TrajectoryLookUp():
         self._fast_index = 0
         self._fast_incre = 0
 
+        # Optional dense speed grid, see build_speed_grid
+        self._grid = None
+        self._grid_row = None
+        self._grid_phase = 0.0
+        self._grid_incre = 0
+        self._CYCLE_TOLERANCE = 0.15 # max relative deviation of an averaged
+                                     # cycle from the median period
+
 
     # TrajLookUp properties
     @property
@@ -79,6 +94,16 @@ class TrajectoryLookUp():
         if self._angle > .5:
             self._angle -= 1
 
+    @property
+    def speed_grid(self):
+        """
+        Return the grid speeds of the blended trajectory table; None if the
+        table was not built
+        """
+        if self._grid is None:
+            return None
+        return self._grid_min + self._grid_step*np.arange(len(self._grid))
+
     @property
     def sh_angle(self):
         """
@@ -99,6 +124,49 @@ class TrajectoryLookUp():
 
     
     # TrajLookUp private fcns
+    def _read_profile(self, filepath):
+        """
+        Read the positions of a gait profile
+
+        Args:
+            string filepath - csv file of position, torque rows
+
+        Rtn:
+            np.array of positions (in rev)
+        """
+        with open(filepath, newline='') as file:
+            return np.array([float(row[0]) for row in csv.reader(file)])
+
+
+    def _build_phase_index(self, positions):
+        """
+        Precompute the sorted-angle index of every profile. For each profile
+        slice of the table, the positions are sorted (ties keep the lowest 
+        index, like idxmin) and each sample is flagged with its swing 
+        direction
+
+        Args:
+            list of np.arrays positions - positions of each profile in the 
+                order of the table
+        """
+        sorted_pos = []
+        sorted_idx = []
+        swing_fwd = []
+        for position in positions:
+            order = np.argsort(position, kind='stable')
+            vals = position[order]
+            # Equal angles resolve to the lowest index of their run
+            run_start = np.flatnonzero(np.r_[True, vals[1:] != vals[:-1]])
+            run_len = np.diff(np.r_[run_start, len(vals)])
+            sorted_pos.append(vals)
+            sorted_idx.append(np.repeat(order[run_start], run_len))
+            # True where the arm swings forward (angle not increasing)
+            swing_fwd.append(position <= np.roll(position, 1))
+        self._sorted_pos = np.concatenate(sorted_pos)
+        self._sorted_idx = np.concatenate(sorted_idx)
+        self._swing_fwd = np.concatenate(swing_fwd)
+
+
     def _blend_traj(self, slow_speed, fast_speed, curr_speed,
          slow_idx, fast_idx):
         """
@@ -115,8 +183,10 @@ class TrajectoryLookUp():
             blended trajectory positions
         """
         alpha = (fast_speed - curr_speed)/(fast_speed - slow_speed)
-        slow_value = self._position_profiles[slow_speed][slow_idx]
-        fast_value = self._position_profiles[fast_speed][fast_idx]
+        slow_value = \
+            self._position_table[self._profile_offsets[slow_speed] + slow_idx]
+        fast_value = \
+            self._position_table[self._profile_offsets[fast_speed] + fast_idx]
         return alpha*slow_value + (1-alpha)*fast_value
 
 
@@ -187,18 +257,170 @@ class TrajectoryLookUp():
         # Get swing condition
         # True = Swing Forward, False = Swing Backward
         swing_cond = (self._angle <= self._past_angle)
-        pos_df = self._position_profiles[preset_speed]
-        diff_df = abs(pos_df - self._angle)
 
-        length = len(pos_df)
-        min_idx = diff_df.idxmin()
-        if (pos_df[min_idx] <= pos_df[(min_idx-1) % length]) == swing_cond:
+        # Binary search the sorted angles for the closest position
+        start = self._profile_offsets[preset_speed]
+        end = start + self._profile_lengths[preset_speed]
+        cand = start + np.searchsorted(self._sorted_pos[start:end], 
+                                       self._angle)
+        if cand == end or (cand > start and 
+            self._compare_cands(cand - 1, cand)):
+            cand -= 1
+        min_idx = self._sorted_idx[cand]
+
+        if self._swing_fwd[start + min_idx] == swing_cond:
             return (min_idx, 1)
         else:
             return (min_idx, -1)
 
 
+    def _compare_cands(self, low, high):
+        """
+        Check if the sorted candidate below the angle is at least as close as
+        the one above it; equally close candidates resolve to the lowest 
+        profile index
+
+        Args:
+            int low - idx of the sorted candidate below the angle
+            int high - idx of the sorted candidate above the angle
+        
+        Rtn:
+            True if low should be chosen
+        """
+        low_diff = abs(self._sorted_pos[low] - self._angle)
+        high_diff = abs(self._sorted_pos[high] - self._angle)
+        if low_diff == high_diff:
+            return self._sorted_idx[low] < self._sorted_idx[high]
+        return low_diff < high_diff
+
+
+    def _extract_cycle(self, speed_key, num_phases):
+        """
+        Average the swing cycles of a profile onto a phase-normalized axis. 
+        Cycles run from peak to peak; cycles far from the median period are 
+        ignored
+
+        Args:
+            float speed_key - speed of the profile
+            int num_phases - number of phase bins of the cycle
+
+        Rtn:
+            tuple of (np.array mean cycle positions, float median period in 
+            samples)
+        """
+        offset = self._profile_offsets[speed_key]
+        position = self._position_table[
+            offset:offset + self._profile_lengths[speed_key]]
+        peaks, _ = signal.find_peaks(
+            position, prominence=0.5*(position.max() - position.min()))
+        if len(peaks) < 2:
+            raise ValueError(f"ERROR: Profile of speed {speed_key} does not "
+                             f"contain a full swing cycle")
+        periods = np.diff(peaks)
+        period = np.median(periods)
+
+        phase = np.arange(num_phases)/num_phases
+        cycles = [np.interp(start + phase*length, 
+                            np.arange(start, start + length + 1),
+                            position[start:start + length + 1])
+                  for start, length in zip(peaks[:-1], periods)
+                  if abs(length - period) <= self._CYCLE_TOLERANCE*period]
+        return np.mean(cycles, axis=0), period
+
+
+    def _get_grid_setpoint(self, est_speed):
+        """
+        Calculate the position setpoint from the dense speed grid. The row 
+        changes once the speed estimate is more than one grid step from the 
+        current row's speed, so every row can be reached from its neighbor 
+        while the estimate's noise within half a step past the midpoint does
+        not flip rows. When the speed row changes, the phase restarts from 
+        the closest position in the new row, so the arm does not jump
+
+        Args:
+            float est_speed - estimated walking speed
+
+        Rtn:
+            The desired position angle(in revolutions) of the arm 
+        """
+        if self._grid_row is None or abs(est_speed - self._grid_min - 
+            self._grid_step*self._grid_row) > self._grid_step:
+            self._curr_speed = est_speed
+            row = int(round((est_speed - self._grid_min)/self._grid_step))
+            row = min(max(row, 0), len(self._grid) - 1)
+            if row != self._grid_row:
+                # Same rule as _search_trajs on the row's phase bins
+                swing_cond = (self._angle <= self._past_angle)
+                phase_idx = int(np.argmin(
+                    np.abs(self._grid[row] - self._angle)))
+                self._grid_phase = float(phase_idx)
+                if self._grid_swing_fwd[row, phase_idx] == swing_cond:
+                    self._grid_incre = 1
+                else:
+                    self._grid_incre = -1
+                self._grid_row = row
+
+        num_phases = self._grid.shape[1]
+        self._grid_phase = (self._grid_phase + 
+            self._grid_incre*self._grid_rate[self._grid_row]) % num_phases
+        return self._grid[self._grid_row, int(self._grid_phase) % num_phases]
+
+
     # TrajLookUp public fcns
+    def build_speed_grid(self, speed_step=0.01, min_speed=None, 
+        max_speed=None, num_phases=256):
+        """
+        Precompute blended trajectories on a dense speed grid. The swing 
+        cycles of each profile are averaged onto a phase-normalized axis and
+        each grid speed stores the blend of its two neighboring cycles with a
+        blended period. get_pos_setpoint then reads the table at the current
+        phase and advances it by the row's phase rate
+
+        Args:
+            float speed_step - spacing of the grid (in m/s); default 0.01
+            float min_speed - slowest grid speed; default slowest profile
+            float max_speed - fastest grid speed; default fastest profile
+            int num_phases - number of phase bins per cycle; default 256
+
+        Rtn:
+            int memory footprint of the grid in bytes
+        """
+        if min_speed is None:
+            min_speed = self._possible_speeds[0]
+        if max_speed is None:
+            max_speed = self._possible_speeds[-1]
+        if speed_step <= 0 or max_speed < min_speed:
+            raise ValueError(f"ERROR: Invalid speed grid; recieved step "
+                             f"{speed_step} from {min_speed} to {max_speed}")
+        num_speeds = int(round((max_speed - min_speed)/speed_step)) + 1
+
+        cycles = {speed_key: self._extract_cycle(speed_key, num_phases)
+                  for speed_key in self._possible_speeds}
+
+        # Blend neighboring cycles and periods for each grid speed
+        self._grid_min = min_speed
+        self._grid_step = speed_step
+        self._grid = np.empty((num_speeds, num_phases))
+        periods = np.empty(num_speeds)
+        for row in range(num_speeds):
+            grid_speed = min_speed + speed_step*row
+            slow_speed, fast_speed = self._get_walk_speeds(grid_speed)
+            if slow_speed is None:
+                self._grid[row], periods[row] = cycles[fast_speed]
+            else:
+                alpha = (fast_speed - grid_speed)/(fast_speed - slow_speed)
+                self._grid[row] = alpha*cycles[slow_speed][0] + \
+                    (1 - alpha)*cycles[fast_speed][0]
+                periods[row] = alpha*cycles[slow_speed][1] + \
+                    (1 - alpha)*cycles[fast_speed][1]
+        self._grid_rate = num_phases/periods # phase bins per sample
+        self._grid_swing_fwd = self._grid <= np.roll(self._grid, 1, axis=1)
+        self._grid_row = None
+
+        return self._grid.nbytes + self._grid_rate.nbytes + \
+            self._grid_swing_fwd.nbytes
+
+
     def get_pos_setpoint(self, steps, time_window, time_till_step=None):
         """
         Calcuate the new position setpoint given the current
@@ -215,6 +437,7 @@ class TrajectoryLookUp():
         """
         # Check if walking
         if steps == -1:  
+            self._grid_row = None
             if abs(self._angle) < .001:
                 return self._angle, None
             elif self._angle < 0.0:
@@ -226,6 +449,8 @@ class TrajectoryLookUp():
 
         # Get new speed
         est_speed = self._conv_step_speed(steps, time_window)
+        if self._grid is not None:
+            return self._get_grid_setpoint(est_speed), None
 
         # Check if change is drastic enough to alter trajectories
         if (abs(self._curr_speed - est_speed) > 3*self._EPSILON):
@@ -247,9 +472,9 @@ class TrajectoryLookUp():
         if self._slow_speed:
             #Update index
             self._slow_index = (self._slow_index + self._slow_incre) % \
-                len(self._position_profiles[self._slow_speed])
+                self._profile_lengths[self._slow_speed]
             self._fast_index = (self._fast_index + self._fast_incre) % \
-                len(self._position_profiles[self._fast_speed])
+                self._profile_lengths[self._fast_speed]
                 
             #Update setpoint
             rtn_setpoint = self._blend_traj(self._slow_speed, 
@@ -261,9 +486,9 @@ class TrajectoryLookUp():
         else:
             #Update index
             self._fast_index = (self._fast_index + self._fast_incre) % \
-                len(self._position_profiles[self._fast_speed])
+                self._profile_lengths[self._fast_speed]
             #Update setpoint
-            rtn_setpoint = \
-                self._position_profiles[self._fast_speed][self._fast_index]
+            rtn_setpoint = self._position_table[
+                self._profile_offsets[self._fast_speed] + self._fast_index]
 
         return rtn_setpoint, None
\ No newline at end of file
@@ -3,7 +3,7 @@
 # Spline generator for angle trajectory
 
 # Python imports
-from collections import deque
+import functools
 
 # Project imports
 
@@ -16,13 +16,15 @@ class TrajectorySplineGenerator:
     Generates a bang-bang angle trajectory 
     """
 
-    def __init__(self, sample_rate, double_pend = False):
+    def __init__(self, sample_rate, double_pend = False, cache_size=64):
         """
         Constuctor for TrajSplineGenerator
 
         Args:
             num sample_rate - rate of incoming data
             bool double_pend - set True to return should angles as well
+            int cache_size - max number of unit swing profiles kept in the
+                least recently used cache; default 64
         """
         # Set public members
         self.time_till_step = -1
@@ -35,13 +37,17 @@ class TrajectorySplineGenerator:
         else:
             self._shoulder_angle = None
         self._double_pend = double_pend
-        self._el_trajectory = deque()
-        self._sh_trajectory = deque()
+        self._el_trajectory = np.array([])
+        self._sh_trajectory = np.array([])
+        self._traj_idx = 0 # cursor of the next setpoint in the trajectories
         self._time_normalizer = 30
         self._HOME_RATE = .001 # in rev/sample
         self._DEGREE_THRES = .005 # in rev
         self._MIN_TIME_NEEDED = 0.2 
         self._swing_forward = True
+        ## Unit swing profiles keyed on the ramp length in samples
+        self._unit_profile = \
+            functools.lru_cache(maxsize=cache_size)(self._make_unit_profile)
 
         # NOTE: The following constants are based on information from:
         # Perry J, Burnfield JM.
@@ -80,6 +86,14 @@ class TrajectorySplineGenerator:
         if self._elbow_angle > .5:
             self._elbow_angle -= 1
 
+    @property
+    def cache_info(self):
+        """
+        Return the hits, misses, max size and current size of the unit swing
+        profile cache
+        """
+        return self._unit_profile.cache_info()
+
     @property
     def sh_angle(self):
         """
@@ -120,6 +134,26 @@ class TrajectorySplineGenerator:
             return (scaled_steps - 27)/25
 
 
+    def _make_unit_profile(self, half_samp):
+        """
+        Make the unit bang-bang swing profile: the running sum of a velocity
+        ramp from 0 up to 1 over half_samp samples and back down. Scaling it 
+        by the peak displacement per sample and offsetting it by the start 
+        angle gives a swing trajectory
+
+        Args:
+            int half_samp - number of samples in the ramp up
+
+        Rtn:
+            read-only np.array of 2*half_samp + 1 samples, ending at half_samp
+        """
+        half_vel = np.arange(half_samp)/max(half_samp, 1)
+        unit_vel = np.concatenate((half_vel, [1.0], half_vel[::-1]))
+        unit_profile = np.cumsum(unit_vel)
+        unit_profile.flags.writeable = False
+        return unit_profile
+
+
     def _get_pos_double_pendulum(self, steps, time_window, time_till_step):
         """
         Calculates return angle for the elbow angle and shoulder angle
@@ -136,8 +170,7 @@ class TrajectorySplineGenerator:
         """
         # Non walking behavior
         if steps == -1: 
-            self._el_trajectory.clear()
-            self._sh_trajectory.clear()
+            self._traj_idx = len(self._el_trajectory)
 
             # Update Elbow
             if abs(self._elbow_angle) < self._DEGREE_THRES:
@@ -161,7 +194,7 @@ class TrajectorySplineGenerator:
         else:
             # walking behavior
             self.time_till_step = time_till_step
-            if len(self._el_trajectory) == 0:
+            if self._traj_idx == len(self._el_trajectory):
 
                 # If we are looking for a step, wait for a bit
                 if self.time_till_step <= self._MIN_TIME_NEEDED:
@@ -192,8 +225,11 @@ class TrajectorySplineGenerator:
                         self.generate_trajectory(shoulder_ext,
                                                  self._shoulder_angle)
                     self._swing_forward = True
+                self._traj_idx = 0
 
-            return self._el_trajectory.popleft(), self._sh_trajectory.popleft()
+            self._traj_idx += 1
+            return self._el_trajectory[self._traj_idx - 1], \
+                self._sh_trajectory[self._traj_idx - 1]
     
 
     def _get_pos_single_pendulum(self, steps, time_window, time_till_step):
@@ -213,7 +249,7 @@ class TrajectorySplineGenerator:
         """
         # Non walking behavior
         if steps == -1: 
-            self._el_trajectory.clear() 
+            self._traj_idx = len(self._el_trajectory)
             if abs(self._elbow_angle) < self._DEGREE_THRES:
                 return self._elbow_angle, None
             elif self._elbow_angle < 0.0:
@@ -225,7 +261,7 @@ class TrajectorySplineGenerator:
 
         # walking behavior
         self.time_till_step = time_till_step
-        if len(self._el_trajectory) == 0:
+        if self._traj_idx == len(self._el_trajectory):
 
             # If we are looking for a step, wait for a bit
             if self.time_till_step <= self._MIN_TIME_NEEDED:
@@ -249,8 +285,10 @@ class TrajectorySplineGenerator:
                     self.generate_trajectory(self._ELBOW_MAX_EXT,
                                              self._elbow_angle)
                 self._swing_forward = True
+            self._traj_idx = 0
 
-        return self._el_trajectory.popleft(), None
+        self._traj_idx += 1
+        return self._el_trajectory[self._traj_idx - 1], None
 
 
     # TrajSplineGenerator public fcn
@@ -262,6 +300,9 @@ class TrajectorySplineGenerator:
             num target_angle - desired end angle of trajectory (in revolutions)
             num current_angle - desired start angle of trajectory 
                 (in revolutions)
+
+        Rtn:
+            np.array of angles (in revolutions), one per sample
         """
         # Get max velocity
         angle_disp = target_angle - current_angle
@@ -270,23 +311,10 @@ class TrajectorySplineGenerator:
         # Get the point where trajectory should hit maximum velocity
         # For this algorithm it's the half-way point
         half_samp = int(self.time_till_step*self.sample_rate*.5)
-        half_vel_traj = np.linspace(0, max_vel, half_samp, endpoint=False)
-
-        # Combine velocities
-        vel_traj = np.concatenate((half_vel_traj, 
-                                   np.array([max_vel]),
-                                   np.flip(half_vel_traj)))
-        vel_traj = vel_traj/self.sample_rate
-
-        # Make trajectory
-        angle_traj = []
-        cand_angle = current_angle
-
-        for vel in vel_traj:
-            cand_angle += vel
-            angle_traj.append(cand_angle)
 
-        return deque(angle_traj)
+        # Scale and offset the cached unit profile of this duration
+        return current_angle + \
+            (max_vel/self.sample_rate)*self._unit_profile(half_samp)
 
 
     def get_elbow_flex_angle(self, est_speed):
@@ -3,17 +3,44 @@
 Create the utilities python package
 """
 
-# Project imports
+# Python imports
+import importlib
 
+# Project imports
 from utils.animation_fcns import animate_simple_pend
 from utils.data_helper_fcns import apply_filter, apply_zero_phase_filter,\
-    build_training_set, extract_feat, get_prec_and_recall, shred_data, read_imu 
-from utils.nupoc_convert_fcns import make_simple_filename, parse_action_dict,\
-    parse_mat_file, parse_trimmed_file
-from utils.parser_fcns import create_simple_file, parse_mt_file, parse_simple_file
+    build_training_set, extract_feat, get_prec_and_recall, shred_bounds, \
+    shred_data
+from utils.feature_fcns import calc_features, psd_features
+from utils.parser_fcns import create_simple_file, parse_log_file, \
+    parse_mt_file, parse_simple_file
 
 def x_version():
     """
     Return current software version
     """
-    return "v0.3"
\ No newline at end of file
+    return "v0.3"
+
+
+# Fcns imported on first access; the NUPOC converters pull in scipy.io
+_LAZY_IMPORTS = {"make_simple_filename": "utils.nupoc_convert_fcns",
+                 "parse_action_dict": "utils.nupoc_convert_fcns",
+                 "parse_mat_file": "utils.nupoc_convert_fcns",
+                 "parse_trimmed_file": "utils.nupoc_convert_fcns"}
+
+
+def __getattr__(name):
+    """
+    Import a lazily loaded fcn on first access
+    """
+    if name in _LAZY_IMPORTS:
+        module = importlib.import_module(_LAZY_IMPORTS[name])
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    """
+    Return the package attributes including the lazily loaded fcns
+    """
+    return sorted(list(globals()) + list(_LAZY_IMPORTS))
@@ -4,18 +4,15 @@ Collection of functions to help massage/manipulate data
 """
 
 # Project import
-from .parser_fcns import parse_mt_file, parse_simple_file
+from .feature_fcns import calc_features
+from .parser_fcns import parse_log_file
 
 # Python import
 import os
-import re 
 
 # 3rd-party import
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
 import numpy as np
-import pandas as pd
-from scipy import signal, stats
+from scipy import signal
 
 
 def apply_filter(data, fs, filter_order, filter_type, cutoff_freq):
@@ -67,6 +64,9 @@ def build_training_set(data_directory, plot_feat=False, binary_class=False):
     Rtn:
         pandas.DataFrame of labeled features
     """
+    # Imported here so runtime users of this module never load pandas
+    import pandas as pd
+
     # Parse files
     samples, labels, rates = fill_samples(data_directory)
 
@@ -110,23 +110,25 @@ def extract_feat(samples, label, enum_label, fs=100, entropy=True):
     Return:
         Dataframe with four columns: DomFreq, Intensity, Periodicity, Label
     """
-    rtn_dict = {"DomFreq":[], "Intensity":[], "Periodicity":[]}
+    import pandas as pd
+
+    rtn_dict = {"DomFreq": np.zeros(len(samples)), 
+                "Intensity": np.zeros(len(samples)), 
+                "Periodicity": np.zeros(len(samples))}
+    # Batch samples of equal length; timestamp jitter varies shred lengths
+    lengths = np.array([len(sample) for sample in samples])
+    for nPts in np.unique(lengths):
+        idxs = np.flatnonzero(lengths == nPts)
+        dom_freq, intensity, periodicity = \
+            calc_features([samples[idx] for idx in idxs], fs)
+        rtn_dict["DomFreq"][idxs] = dom_freq
+        rtn_dict["Intensity"][idxs] = intensity
+        if entropy:
+            rtn_dict["Periodicity"][idxs] = periodicity
+        # TO-DO: Add custom spread calculation and compare performance
+        # For now make non-entropy calc 0 zero out the Periodicity axis
     rtn_dict["Label"] = [label]*len(samples)
     rtn_dict["EnumLabel"] = [enum_label]*len(samples)
-    for sample in samples:
-        nPts = len(sample)
-        f, Pxx = signal.welch(sample, fs, nperseg=nPts)
-        max_idx = np.argmax(Pxx)
-        rtn_dict["DomFreq"].append(f[max_idx])
-        rtn_dict["Intensity"].append(Pxx[max_idx])
-        if entropy:
-            P_sum = sum(Pxx)
-            Pxx_norm = Pxx/P_sum
-            rtn_dict["Periodicity"].append(stats.entropy(Pxx_norm))
-        else:
-            # TO-DO: Add custom spread calculation and compare performance
-            # For now make non-entropy calc 0 zero out the Periodicity axis
-            rtn_dict["Periodicity"].append(0)
 
     feat_df = pd.DataFrame(rtn_dict)
     return feat_df
@@ -155,14 +157,8 @@ def fill_samples(dir):
     data_files = [f for f in os.listdir(dir) \
         if os.path.isfile(os.path.join(dir, f))]
     for file in data_files:
-        if re.match(r"\AMT", file):
-            print(f"Dir: {os.path.join(dir, file)}")
-            data_dict = parse_mt_file(os.path.join(dir,file))
-        elif re.match(r"\ASIM", file):
-            print(f"SIM: {os.path.join(dir, file)}")
-            data_dict = parse_simple_file(os.path.join(dir,file))
-        else:
-            raise Exception("Invalid File Format found")
+        print(f"File: {os.path.join(dir, file)}")
+        data_dict = parse_log_file(os.path.join(dir, file))
         samples.append(shred_data(data_dict))
         labels.append(str.lower(data_dict['Action']))
         rates.append(data_dict['SampleRate'])
@@ -201,6 +197,10 @@ def plot_features(features, plot3D=True):
     """
     Plot feature space
     """
+    # Imported here so headless users of this module never load matplotlib
+    import matplotlib.pyplot as plt
+    from mpl_toolkits.mplot3d import Axes3D
+
     label_vals = features["Label"].unique()
     # Set up Figures and Axes
     fig1 = plt.figure(1)
@@ -268,27 +268,40 @@ def plot_features(features, plot3D=True):
     plt.show()
 
 
-def read_imu(ser_obj, debug=False):
+def shred_bounds(time_series, interval=3.0, hop=1):
     """
-    Parse data from the IMU
+    Find the boundaries of the shreds of a time series. A shred starts at a 
+    sample and holds every sample less than interval seconds after it. Only 
+    shreds starting more than interval seconds before the final sample are 
+    made
 
     Args:
-        PySerial Serial - port connected to IMU
+        np.array time_series - increasing timestamps in seconds
+        float interval - how long, in seconds, each shred should be
+        int hop - number of samples between the starts of shreds; default 1
 
-    Returns:
-        floats(3) Accelerations for the x, y, and z direction
-    
-    Note:
-        This fcn blocks until all read numbers are read 
+    Returns
+        tuple of np.arrays (starts, ends) - index of the first sample and one 
+            past the last sample of each shred
     """
-    data_read = ser_obj.read_until(b'\n')
-    if (debug):
-        print(data_read)
-    data_read = str(data_read,'utf-8')
-    return [float(i) for i in data_read.split()] 
+    time_series = np.asarray(time_series)
+    # Shreds start while there is more than one interval of data left
+    num_starts = np.argmin((time_series[-1] - time_series) > interval)
+    starts = np.arange(0, num_starts, hop)
+
+    # Compare elapsed time the same way as the per sample loop did, so 
+    # rounding at the boundary can shift the end by one sample at most
+    ends = np.searchsorted(time_series, time_series[starts] + interval)
+    elapsed = time_series[ends - 1] - time_series[starts]
+    ends[elapsed >= interval] -= 1
+    elapsed = time_series[ends] - time_series[starts]
+    ends[elapsed < interval] += 1
+
+    return starts, ends
 
 
-def shred_data(data_dict, samples=None, interval=3.0, time_key="Time_s", data_key="AccM"):
+def shred_data(data_dict, samples=None, interval=3.0, time_key="Time_s", 
+    data_key="AccM", hop=1):
     """
     Convert time series data into shreds of interval length. 
     Shreds are arrays with all data within one interval of current timestep
@@ -301,30 +314,16 @@ def shred_data(data_dict, samples=None, interval=3.0, time_key="Time_s", data_ke
         float interval - how long, in seconds, each shred should be
         literal time_key - Key to access time series in data_dict
         literal data_key - Key to access data series in data_dict
+        int hop - number of samples between the starts of shreds; default 1
 
     Returns
-        List of shreds(np.array). If samples is not None, the returned list
-        will have samples prepended to the results. e.g.
-        results = samples + new shreds
+        List of shreds(np.array). Shreds are views into data_dict[data_key], 
+        not copies. If samples is not None, the returned list will have 
+        samples prepended to the results. e.g. results = samples + new shreds
     """
-    final_time = data_dict[time_key][-1]
-    idx = 0
-    curr_time = data_dict[time_key][idx]
-    rtn_array = []
-    while (final_time - curr_time) > interval:
-        next_time = curr_time
-        next_idx = idx
-        curr_sample = []
-        # Make shred
-        while (next_time - curr_time) < interval:
-            curr_sample.append(data_dict[data_key][next_idx])
-            next_idx += 1
-            next_time = data_dict[time_key][next_idx]
-        # Save shred
-        s_arry = np.array(curr_sample)
-        rtn_array.append(s_arry)
-        idx += 1
-        curr_time = data_dict[time_key][idx]
+    data = np.asarray(data_dict[data_key])
+    starts, ends = shred_bounds(data_dict[time_key], interval, hop)
+    rtn_array = [data[start:end] for start, end in zip(starts, ends)]
 
     if samples is not None:
         rtn_array = samples + rtn_array
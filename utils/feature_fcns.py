@@ -0,0 +1,62 @@
+#! /usr/bin/env python3
+"""
+Collection of functions to extract classifier features from acceleration data
+"""
+
+# Project import
+
+# Python import
+
+# 3rd-party import
+import numpy as np
+from scipy import signal, stats
+
+
+def calc_features(windows, fs=100, batch_size=2048):
+    """
+    Calculate the classifier features of many windows at once. The features
+    are dominant frequency, intensity at dominant freq, and periodicity
+    (spectral entropy) of one welch segment spanning the whole window
+
+    Args:
+        2-D array-like windows - acceleration time-series, one window per row;
+            a list of equal length arrays is also accepted. A 1-D array is
+            treated as a single window
+        num fs - sampling frequency of the data
+        int batch_size - max number of windows per welch call; bounds the
+            memory used by the spectra
+
+    Return:
+        tuple of np.arrays (DomFreq, Intensity, Periodicity), one entry per
+        window
+    """
+    if np.ndim(windows) == 1:
+        windows = [windows]
+
+    features = []
+    for start_idx in range(0, len(windows), batch_size):
+        chunk = np.asarray(windows[start_idx:start_idx + batch_size])
+        f, Pxx = signal.welch(chunk, fs, nperseg=chunk.shape[-1], axis=-1)
+        features.append(psd_features(f, Pxx))
+
+    if len(features) == 0:
+        return tuple(np.array([]) for _ in range(3))
+    return tuple(np.concatenate(feat) for feat in zip(*features))
+
+
+def psd_features(f, Pxx):
+    """
+    Calculate the classifier features from power spectral densities
+
+    Args:
+        np.array f - sample frequencies of the spectra
+        np.array Pxx - power spectral densities along the last axis
+
+    Return:
+        tuple of (DomFreq, Intensity, Periodicity); arrays with the last
+        axis of Pxx removed
+    """
+    max_idx = np.argmax(Pxx, axis=-1)
+    intensity = np.take_along_axis(Pxx, max_idx[..., None], axis=-1)[..., 0]
+    Pxx_norm = Pxx/Pxx.sum(axis=-1, keepdims=True)
+    return f[max_idx], intensity, stats.entropy(Pxx_norm, axis=-1)
@@ -8,10 +8,16 @@ Collection of parsers for the various data files in project
 # Python import
 import csv
 import datetime
+import json
+import os
+import re
 
 # 3rd-party import
 import numpy as np
-import pandas as pd
+
+# Sidecar cache of parsed logfiles
+_CACHE_DIR = '__logcache__'
+_CACHE_VERSION = 1
 
 
 def create_simple_file(filepath, activity, sample_rate, df):
@@ -50,9 +56,10 @@ def parse_mt_file(filepath, ACTION_LINE = 4, RATE_LINE = 5):
     Args:
         string - filepath: filepath to MT .txt file
         int - ACTION_LINE: A const value to represent which fileline
-            has the action being performed
+            has the action being performed. Must be within the header
         int - RATE_LINE: A const value representing which fileline
-            has the sample rate (in Hz) of the data collected.
+            has the sample rate (in Hz) of the data collected. Must be 
+            within the header
     
     Return:
         dict with the following:
@@ -67,33 +74,28 @@ def parse_mt_file(filepath, ACTION_LINE = 4, RATE_LINE = 5):
             'Action': Activity being logged (eg 'walking', 'squating', etc)
             'SampleRate': Rate of data collection[in Hz]
     """
-    df = pd.read_csv(filepath, skiprows=6)
+    # Imported here so cached logs load without pandas
+    import pandas as pd
+
+    # Read the header and the data from one file handle
+    with open(filepath) as fp:
+        header = [fp.readline() for _ in range(6)]
+        df = pd.read_csv(fp)
+
     # Output data rate is 100Hz or 0.01s between samples
-    start_sample = df['PacketCounter'][0]
-    df['Time_s'] = [0.01 * (df['PacketCounter'][i] - start_sample) for i in range(len(df['PacketCounter']))]
-    df['AccM'] = [np.sqrt(np.power(df['Acc_X'][i], 2) + np.power(df['Acc_Y'][i], 2) + np.power(df['Acc_Z'][i], 2))
-                    for i in range(len(df['Acc_X']))]
-    rtn_dic = {'Time_s': df['Time_s'].values,
+    packets = df['PacketCounter'].values
+    rtn_dic = {'Time_s': 0.01 * (packets - packets[0]),
                'AccX': df['Acc_X'].values,
                'AccY': df['Acc_Y'].values,
                'AccZ': df['Acc_Z'].values,
-               'AccM': df['AccM'].values,
+               'AccM': _calc_magnitude(df['Acc_X'].values, 
+                                       df['Acc_Y'].values, 
+                                       df['Acc_Z'].values),
                'FreeAccX': df['FreeAcc_X'].values,
                'FreeAccY': df['FreeAcc_Y'].values,
                'FreeAccZ': df['FreeAcc_Z'].values}
-
-    with open(filepath) as fp:
-        for i, line in enumerate(fp):
-            action_found = False
-            rate_found = False
-            if i == ACTION_LINE:
-                rtn_dic['Action'] = line.split(',')[1]
-                action_found = True
-            elif i == RATE_LINE:
-                rtn_dic['SampleRate'] = int(line.split(',')[1])
-                rate_found = True
-            if (action_found and rate_found):
-                break
+    rtn_dic['Action'] = header[ACTION_LINE].split(',')[1]
+    rtn_dic['SampleRate'] = int(header[RATE_LINE].split(',')[1])
 
     return rtn_dic
 
@@ -105,9 +107,10 @@ def parse_simple_file(filepath, ACTION_LINE = 2, RATE_LINE = 3):
     Args:
         string - filepath: filepath to SIM .txt file
         int - ACTION_LINE: A const value to represent which fileline
-            has the action being performed
+            has the action being performed. Must be within the header
         int - RATE_LINE: A const value representing which fileline
-            has the sample rate (in Hz) of the data collected.
+            has the sample rate (in Hz) of the data collected. Must be 
+            within the header
     
     Return:
         dict with the following:
@@ -119,27 +122,143 @@ def parse_simple_file(filepath, ACTION_LINE = 2, RATE_LINE = 3):
             'Action': Activity being logged (eg 'walking', 'squating', etc)
             'SampleRate': Rate of data collection[in Hz]
     """
-    df = pd.read_csv(filepath, skiprows=4)
+    # Imported here so cached logs load without pandas
+    import pandas as pd
+
+    # Read the header and the data from one file handle
+    with open(filepath) as fp:
+        header = [fp.readline() for _ in range(4)]
+        df = pd.read_csv(fp)
 
-    df['AccM'] = [np.sqrt(np.power(df['AccX'][i], 2) + np.power(df['AccY'][i], 2) + np.power(df['AccZ'][i], 2))
-                    for i in range(len(df['AccX']))]
     rtn_dic = {'Time_s': df['Time'].values,
                'AccX': df['AccX'].values,
                'AccY': df['AccY'].values,
                'AccZ': df['AccZ'].values,
-               'AccM': df['AccM'].values}
+               'AccM': _calc_magnitude(df['AccX'].values, 
+                                       df['AccY'].values, 
+                                       df['AccZ'].values)}
+    rtn_dic['Action'] = header[ACTION_LINE].rstrip().split(',')[1]
+    rtn_dic['SampleRate'] = float(header[RATE_LINE].rstrip().split(',')[1])
 
-    with open(filepath) as fp:
-        for i, line in enumerate(fp):
-            action_found = False
-            rate_found = False
-            if i == ACTION_LINE:
-                rtn_dic['Action'] = line.rstrip().split(',')[1]
-                action_found = True
-            elif i == RATE_LINE:
-                rtn_dic['SampleRate'] = float(line.rstrip().split(',')[1])
-                rate_found = True
-            if (action_found and rate_found):
-                break
-
-    return rtn_dic
\ No newline at end of file
+    return rtn_dic
+
+
+def parse_log_file(filepath, use_cache=True):
+    """
+    Parse a logfile with the parser matching its filename prefix; "MT" files
+    use parse_mt_file and "SIM" files use parse_simple_file. 
+
+    Parsed logs are cached as a binary sidecar in a __logcache__ directory 
+    next to the logfile. The sidecar is keyed on the logfile's path, size and
+    modification time and is memory mapped on later calls, so the returned 
+    arrays are read-only
+
+    Args:
+        string - filepath: filepath to logfile
+        bool - use_cache: if true, load from/save to the sidecar cache; 
+            default True
+        
+    Return:
+        dict from the matching parser
+    """
+    filename = os.path.basename(filepath)
+    if re.match(r"\AMT", filename):
+        parser = parse_mt_file
+    elif re.match(r"\ASIM", filename):
+        parser = parse_simple_file
+    else:
+        raise ValueError(f"Invalid File Format found: {filepath}")
+
+    if not use_cache:
+        return parser(filepath)
+
+    data_dict = _load_cached_log(filepath)
+    if data_dict is None:
+        data_dict = parser(filepath)
+        _save_cached_log(filepath, data_dict)
+    return data_dict
+
+
+def _calc_magnitude(x, y, z):
+    """
+    Return the element-wise magnitude of three component arrays
+    """
+    return np.sqrt(np.power(x, 2) + np.power(y, 2) + np.power(z, 2))
+
+
+def _cache_paths(filepath):
+    """
+    Return the filepaths of the data and metadata sidecars of a logfile
+    """
+    log_dir, filename = os.path.split(os.path.abspath(filepath))
+    cache_base = os.path.join(log_dir, _CACHE_DIR, filename)
+    return cache_base + '.npy', cache_base + '.json'
+
+
+def _cache_key(filepath):
+    """
+    Return the key identifying the current version of a logfile
+    """
+    stat = os.stat(filepath)
+    return {'path': os.path.abspath(filepath),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'version': _CACHE_VERSION}
+
+
+def _load_cached_log(filepath):
+    """
+    Load a parsed logfile from its sidecar cache
+
+    Args:
+        string - filepath: filepath to logfile
+
+    Return:
+        dict matching the logfile's parser, with the arrays memory mapped
+        from the sidecar; None if there is no valid sidecar
+    """
+    data_path, meta_path = _cache_paths(filepath)
+    try:
+        with open(meta_path) as fp:
+            meta = json.load(fp)
+        if meta['key'] != _cache_key(filepath):
+            return None
+        columns = np.load(data_path, mmap_mode='r')
+    except (OSError, ValueError, KeyError):
+        return None
+    if len(columns) != len(meta['columns']):
+        return None
+
+    rtn_dic = dict(zip(meta['columns'], columns))
+    rtn_dic.update(meta['header'])
+    return rtn_dic
+
+
+def _save_cached_log(filepath, data_dict):
+    """
+    Write a parsed logfile to its sidecar cache. Failing to write the cache 
+    (eg a read-only data directory) is not an error
+
+    Args:
+        string - filepath: filepath to logfile
+        dict - data_dict: parsed logfile
+    """
+    data_path, meta_path = _cache_paths(filepath)
+    columns = [key for key, val in data_dict.items() 
+               if isinstance(val, np.ndarray)]
+    meta = {'key': _cache_key(filepath),
+            'columns': columns,
+            'header': {key: val for key, val in data_dict.items() 
+                       if key not in columns}}
+    try:
+        os.makedirs(os.path.dirname(data_path), exist_ok=True)
+        # Write to temp files first so readers never see a partial sidecar
+        with open(data_path + '.tmp', mode='wb') as fp:
+            np.save(fp, np.vstack([data_dict[key] for key in columns])
+                    .astype(np.float64))
+        with open(meta_path + '.tmp', mode='w') as fp:
+            json.dump(meta, fp)
+        os.replace(data_path + '.tmp', data_path)
+        os.replace(meta_path + '.tmp', meta_path)
+    except OSError:
+        pass